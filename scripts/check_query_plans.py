@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Query plan regression check for the Aspen-Lite API.
+
+Drives every server_v2.py route against generated datasets, captures the SQL
+each request actually issues, and for every SELECT records its
+EXPLAIN QUERY PLAN and best-of-N execution time. Results are compared against a
+stored baseline; the check fails when a statement's plan changes or its
+latency regresses past the threshold.
+
+Latencies are stored relative to a reference query timed in the same run, so
+a baseline recorded on one machine can be checked on another.
+
+Usage:
+    # Compare against the stored baseline
+    python3 scripts/check_query_plans.py
+
+    # Record new and changed statements (after an intentional query change)
+    python3 scripts/check_query_plans.py --update-baseline
+
+    # Re-time every statement (e.g. after a change that affects all queries)
+    python3 scripts/check_query_plans.py --update-baseline --retime
+
+    # Only the small datasets
+    python3 scripts/check_query_plans.py --sizes 1000,10000
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import random
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+import generate_test_data
+import migrate_data
+import server_v2
+
+BASELINE_PATH = REPO_ROOT / 'scripts' / 'query_plan_baseline.json'
+DATASET_DIR = REPO_ROOT / 'data' / 'plan_datasets'
+
+# Dataset size -> number of schools (mirrors generate_test_data.py examples)
+DATASETS = {1000: 50, 10000: 100, 300000: 1000}
+
+# Representative requests covering every route and filter shape
+PROBES = [
+    ('GET', '/api/schools', None),
+    ('GET', '/api/schools?search=high&limit=20', None),
+    ('POST', '/api/schools/favorites', {'schoolIds': [1, 2, 3]}),
+    ('POST', '/api/schools/overview', {'schoolIds': [1, 2, 3]}),
+    ('GET', '/api/schools/1/students', None),
+    ('GET', '/api/schools/1/students?grade=9&gender=Female&ethnicity=Asian', None),
+    ('GET', '/api/schools/1/students?search=an&offset=50', None),
+    ('GET', '/api/schools/1/students/export?format=csv', None),
+    ('GET', '/api/schools/1/filters', None),
+    ('GET', '/api/students/10000000', None),
+    ('GET', '/api/search/students?q=an', None),
+    ('GET', '/api/search/students?q=an&schoolId=1', None),
+    ('GET', '/api/analytics/demographics?groupBy=school,grade', None),
+    ('GET', '/api/analytics/demographics/summary?groupBy=school,grade', None),
+    ('GET', '/api/analytics/demographics/summary?groupBy=gender,ethnicity&schoolId=1', None),
+    ('GET', '/api/encounters?studentId=10000000', None),
+    ('GET', '/api/encounters?schoolId=1&cursor=2026-01-01T00:00:00.000Z|100', None),
+    ('GET', '/api/encounters?date=2026-01-01', None),
+    ('GET', '/api/encounters/stats?from=2026-01-01&to=2026-01-31', None),
+    ('GET', '/api/encounters/stats?schoolId=1', None),
+    ('GET', '/api/integrations/icare/metrics?from=2026-01-01T00:00:00Z&to=2026-01-08T00:00:00Z', None),
+    ('GET', '/api/health', None),
+]
+
+TIMING_RUNS = 7
+
+# Data-independent SQLite workload timed alongside the probes; baseline
+# latencies are stored as multiples of it
+REFERENCE_SQL = '''
+    WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 100000)
+    SELECT SUM(x % 7), COUNT(*) FROM n
+'''
+
+def build_dataset(num_students, num_schools, regenerate=False):
+    """Generate and import a dataset once, reusing it on later runs."""
+    DATASET_DIR.mkdir(parents=True, exist_ok=True)
+    json_path = DATASET_DIR / f'students_{num_students}.json'
+    db_path = DATASET_DIR / f'students_{num_students}.db'
+
+    migrate_data.DB_PATH = str(db_path)
+    migrate_data.SNAPSHOT_DIR = str(DATASET_DIR / f'snapshots_{num_students}')
+
+    if db_path.exists() and not regenerate:
+        # Pick up any tables or indexes added since the dataset was built
+        with contextlib.redirect_stdout(io.StringIO()):
+            migrate_data.init_database()
+            conn = sqlite3.connect(db_path)
+            if not conn.execute('SELECT 1 FROM demographic_cube LIMIT 1').fetchone():
+                migrate_data.rebuild_demographic_stats()
+            conn.close()
+        return db_path
+
+    print(f"Building {num_students:,}-student dataset...")
+    db_path.unlink(missing_ok=True)
+
+    random.seed(num_students)  # Same data on every machine
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_test_data.generate_students(num_students, num_schools, str(json_path))
+        migrate_data.init_database()
+        migrate_data.import_json_data(str(json_path))
+
+    json_path.unlink()
+    return db_path
+
+def normalize_sql(sql):
+    """Replace literals with ? and collapse whitespace so statements group by shape."""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    return ' '.join(sql.split())
+
+def capture_statements(db_path, num_students):
+    """Run every probe against the dataset and return the SELECTs it issued."""
+    # Fresh module state so in-memory caches from another dataset don't leak
+    server = importlib.reload(server_v2)
+    server.DB_PATH = str(db_path)
+    server.SNAPSHOT_PATH = str(DATASET_DIR / f'snapshots_{num_students}' / 'students.arrow')
+
+    statements = []
+    original_get_db = server.get_db
+
+    def traced_get_db():
+        conn = original_get_db()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    server.get_db = traced_get_db
+
+    # Probes aren't real record views; auditing them would grow the cached
+    # datasets and put a background writer alongside the timing runs
+    server.audit_log.enabled = False
+
+    client = server.app.test_client()
+    for method, url, body in PROBES:
+        if method == 'POST':
+            response = client.post(url, json=body)
+        else:
+            response = client.get(url)
+        response.get_data()  # Drain streaming responses
+        if response.status_code >= 500:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}")
+
+    unique = {}
+    for sql in statements:
+        if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            unique.setdefault(normalize_sql(sql), sql)
+    return unique
+
+def best_time(conn, sql):
+    """Best of TIMING_RUNS executions in milliseconds, after one warm-up run."""
+    conn.execute(sql).fetchall()  # Warm the page cache
+
+    timings = []
+    for _ in range(TIMING_RUNS):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def measure_reference():
+    """Time REFERENCE_SQL, the unit baseline latencies are expressed in."""
+    conn = sqlite3.connect(':memory:')
+    reference_ms = best_time(conn, REFERENCE_SQL)
+    conn.close()
+    return reference_ms
+
+def measure(db_path, statements, reference_ms):
+    """
+    Collect plan details and latency for each captured statement.
+
+    Latency is the best of TIMING_RUNS after one warm-up run, which is far
+    less noisy than the mean or median on a shared machine.
+    """
+    conn = sqlite3.connect(db_path)
+    results = {}
+
+    for key, sql in statements.items():
+        plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+        ms = best_time(conn, sql)
+        results[key] = {'plan': plan, 'ms': round(ms, 3), 'relative': round(ms / reference_ms, 6)}
+
+    conn.close()
+    return results
+
+def full_scans(plan):
+    """Return plan lines that scan a table without an index (subquery and virtual table scans aside)."""
+    return [line for line in plan
+            if line.startswith('SCAN') and 'INDEX' not in line and not line.startswith('SCAN (')]
+
+def expected_ms(previous, reference_ms):
+    """A baseline entry's latency scaled to this machine."""
+    if 'relative' in previous:
+        return previous['relative'] * reference_ms
+    return previous['ms']
+
+def compare(size, results, baseline, threshold, min_ms, reference_ms):
+    """Compare one dataset's results with its baseline. Returns a list of failures."""
+    failures = []
+    expected = baseline.get(str(size), {})
+
+    for key, result in results.items():
+        previous = expected.get(key)
+        scans = full_scans(result['plan'])
+
+        if previous is None:
+            if scans:
+                failures.append(f"new statement does a full scan ({'; '.join(scans)}):\n      {key}")
+            else:
+                print(f"  + new statement (not in baseline): {key[:90]}")
+            continue
+
+        if result['plan'] != previous['plan']:
+            new_scans = [line for line in scans if line not in full_scans(previous['plan'])]
+            change = f"degraded to full scan ({'; '.join(new_scans)})" if new_scans else 'changed'
+            failures.append(
+                f"plan {change}:\n      {key}\n"
+                f"      was: {' | '.join(previous['plan'])}\n"
+                f"      now: {' | '.join(result['plan'])}"
+            )
+            continue
+
+        baseline_ms = expected_ms(previous, reference_ms)
+        limit = max(baseline_ms * (1 + threshold), baseline_ms + min_ms)
+        if result['ms'] > limit:
+            failures.append(
+                f"latency {result['ms']:.2f}ms exceeds baseline {baseline_ms:.2f}ms "
+                f"(scaled to this machine):\n      {key}"
+            )
+
+    for key in expected.keys() - results.keys():
+        print(f"  - statement no longer issued: {key[:90]}")
+
+    return failures
+
+def update(size, results, baseline, retime):
+    """
+    Fold one dataset's results into the baseline.
+
+    Only new statements and statements whose plan changed are recorded, so
+    the latency gate for everything else keeps its original timings; retime
+    records every statement afresh.
+    """
+    expected = baseline.get(str(size), {})
+    updated = {}
+
+    for key, result in results.items():
+        previous = expected.get(key)
+        if retime or previous is None or previous['plan'] != result['plan']:
+            updated[key] = result
+            if previous is None:
+                print(f"  + recorded new statement: {key[:90]}")
+            elif previous['plan'] != result['plan']:
+                print(f"  ~ recorded changed plan: {key[:90]}")
+        else:
+            updated[key] = previous
+
+    for key in expected.keys() - results.keys():
+        print(f"  - dropped statement no longer issued: {key[:90]}")
+
+    baseline[str(size)] = updated
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query plan regression check for the Aspen-Lite API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Check all datasets against the baseline
+  python3 scripts/check_query_plans.py
+
+  # Record new and changed statements in the baseline
+  python3 scripts/check_query_plans.py --update-baseline
+
+  # Allow up to 200% latency regression
+  python3 scripts/check_query_plans.py --threshold 2.0
+        """
+    )
+
+    parser.add_argument(
+        '--sizes',
+        type=str,
+        default=','.join(str(size) for size in DATASETS),
+        help='Comma-separated dataset sizes (default: 1000,10000,300000)'
+    )
+
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=1.0,
+        help='Allowed relative latency regression (default: 1.0 = 100%%)'
+    )
+
+    parser.add_argument(
+        '--min-ms',
+        type=float,
+        default=1.0,
+        help='Regressions smaller than this many milliseconds are ignored (default: 1.0)'
+    )
+
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help=f'Record new and changed statements in {BASELINE_PATH.relative_to(REPO_ROOT)} '
+             'instead of comparing'
+    )
+
+    parser.add_argument(
+        '--retime',
+        action='store_true',
+        help='With --update-baseline, re-record the timings of unchanged statements too'
+    )
+
+    parser.add_argument(
+        '--regenerate',
+        action='store_true',
+        help='Rebuild the cached datasets'
+    )
+
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    unknown = [size for size in sizes if size not in DATASETS]
+    if unknown:
+        parser.error(f"Unknown dataset size: {unknown[0]} (choose from {', '.join(map(str, DATASETS))})")
+
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+    elif not args.update_baseline:
+        print(f"Error: No baseline at {BASELINE_PATH}")
+        print("Run with --update-baseline first")
+        return 1
+
+    all_failures = []
+    for size in sizes:
+        db_path = build_dataset(size, DATASETS[size], args.regenerate)
+        statements = capture_statements(db_path, size)
+        reference_ms = measure_reference()
+        results = measure(db_path, statements, reference_ms)
+
+        print(f"\n{size:,} students: {len(results)} statements (reference query {reference_ms:.2f}ms)")
+        for key, result in results.items():
+            marker = '⚠' if full_scans(result['plan']) else '✓'
+            print(f"  {marker} {result['ms']:8.2f}ms  {key[:90]}")
+
+        if args.update_baseline:
+            update(size, results, baseline, args.retime)
+        else:
+            failures = compare(size, results, baseline, args.threshold, args.min_ms, reference_ms)
+            all_failures.extend(f"[{size:,}] {failure}" for failure in failures)
+
+    if args.update_baseline:
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+        print(f"\n✓ Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if all_failures:
+        print(f"\n❌ {len(all_failures)} regression(s):")
+        for failure in all_failures:
+            print(f"  {failure}")
+        return 1
+
+    print("\n✓ No query plan or latency regressions")
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Batch HSP (health service plan) trigger detection over stored encounters.
+
+Applies the encounter-level rules from src/lib/hsp-detection.ts to the
+encounters table and writes the results to encounter_hsp_triggers. Free text
+is scanned once per encounter with an Aho-Corasick automaton over all
+medication and condition patterns, across a process pool.
+
+Runs are incremental: only encounters added or updated since the last run
+are rescanned. When the pattern lists in hsp-detection.ts change, the next run
+rescans everything.
+
+Student clinical data (known medications and conditions) isn't stored in the
+database, so mentions are recorded as-is; the UI compares them against the
+student's HSP when showing them.
+
+Usage:
+    # Scan encounters changed since the last run
+    python3 scripts/detect_hsp_triggers.py
+
+    # Rescan everything
+    python3 scripts/detect_hsp_triggers.py --full
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DB_PATH = 'data/aspen.db'
+RULES_PATH = Path(__file__).resolve().parent.parent / 'src' / 'lib' / 'hsp-detection.ts'
+
+# Encounters committed just before the previous checkpoint may not have been
+# visible to that run, so each run re-reads this far behind it.
+CHECKPOINT_OVERLAP = timedelta(minutes=5)
+
+def load_patterns(rules_path=RULES_PATH):
+    """Read MEDICATION_PATTERNS and CONDITION_PATTERNS from hsp-detection.ts."""
+    source = Path(rules_path).read_text()
+
+    patterns = {}
+    for name in ('MEDICATION_PATTERNS', 'CONDITION_PATTERNS'):
+        match = re.search(rf'const {name} = \[(.*?)\];', source, re.DOTALL)
+        if not match:
+            raise ValueError(f"{name} not found in {rules_path}")
+        patterns[name] = re.findall(r"'([^']+)'", match.group(1))
+
+    return patterns['MEDICATION_PATTERNS'], patterns['CONDITION_PATTERNS']
+
+def ruleset_hash(medications, conditions):
+    """Fingerprint of the pattern lists, stored with the checkpoint."""
+    return hashlib.sha256('\n'.join(medications + ['--'] + conditions).encode()).hexdigest()
+
+class AhoCorasick:
+    """Multi-pattern substring matcher: one pass over the text finds every pattern."""
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+
+        # Breadth-first failure links
+        queue = list(self.goto[0].values())
+        while queue:
+            state = queue.pop(0)
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                if self.fail[next_state] == next_state:
+                    self.fail[next_state] = 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find(self, text):
+        """Return indexes of patterns occurring in text, in pattern-list order."""
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            found.update(self.output[state])
+        return sorted(found)
+
+# Per-worker matcher, built once by init_worker()
+_matcher = None
+_medication_count = 0
+
+def init_worker(medications, conditions):
+    global _matcher, _medication_count
+    _matcher = AhoCorasick(medications + conditions)
+    _medication_count = len(medications)
+
+def parse_actions(actions_taken):
+    """Decode an encounter's actions_taken JSON array; anything else counts as no actions."""
+    try:
+        actions = json.loads(actions_taken or '[]')
+    except ValueError:
+        return set()
+    return {a for a in actions if isinstance(a, str)} if isinstance(actions, list) else set()
+
+def detect_triggers(encounters):
+    """
+    Apply the encounter-level HSP rules to a chunk of encounters.
+
+    Each encounter is (id, student_id, text, actions_taken, disposition).
+    Returns trigger rows for encounter_hsp_triggers.
+    """
+    rows = []
+    for encounter_id, student_id, text, actions_taken, disposition in encounters:
+        actions = parse_actions(actions_taken)
+        mentions = _matcher.find(text.lower())
+        medications = [_matcher.patterns[i] for i in mentions if i < _medication_count]
+        conditions = [_matcher.patterns[i] for i in mentions if i >= _medication_count]
+
+        def add(trigger_type, term, confidence, description):
+            rows.append((encounter_id, trigger_type, term, student_id, confidence, description))
+
+        if 'medication_given' in actions:
+            for med in medications:
+                add('new_medication', med, 'high', f'Medication "{med.capitalize()}" administered')
+            if not medications:
+                add('new_medication', '', 'medium',
+                    'Medication administered - verify HSP has current med list')
+
+        if 'ems_called' in actions:
+            add('emergency_action', 'ems_called', 'high',
+                'EMS was called - may need emergency action plan update')
+
+        if disposition == 'ems_transport':
+            add('emergency_action', 'ems_transport', 'high',
+                'Student transported by EMS - review emergency procedures')
+
+        for condition in conditions:
+            add('new_condition', condition, 'medium',
+                f'Possible new condition "{condition.capitalize()}" mentioned')
+
+        if 'blood_sugar_checked' in actions:
+            add('new_condition', 'blood_sugar_checked', 'medium',
+                'Blood sugar checked - student may need diabetes monitoring in HSP')
+
+    return rows
+
+def read_chunks(cursor, chunk_size):
+    """Yield lists of encounters to scan, chunk_size at a time."""
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+def run_detection(full=False, workers=None, chunk_size=500):
+    """Scan changed (or all) encounters and store their triggers."""
+    medications, conditions = load_patterns()
+    rules = ruleset_hash(medications, conditions)
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    # Databases created before last_seq existed scan everything once more
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(hsp_scan_state)")]
+    if 'last_seq' not in columns:
+        cursor.execute("ALTER TABLE hsp_scan_state ADD COLUMN last_seq INTEGER NOT NULL DEFAULT 0")
+        conn.commit()
+
+    state = cursor.execute("SELECT ruleset_hash, checkpoint, last_seq FROM hsp_scan_state WHERE id = 1").fetchone()
+    last_seq = 0
+    if full or not state or state[0] != rules:
+        reason = 'requested' if full else ('first run' if not state else 'pattern lists changed')
+        print(f"Full scan ({reason})")
+        since = ''
+        cursor.execute("DELETE FROM encounter_hsp_triggers")
+        conn.commit()
+    elif not state[1]:
+        print("Incremental scan (no encounters scanned yet)")
+        since = ''
+    else:
+        # New rows (including imports that keep an old updatedAt) are found by
+        # seq, edits to already-scanned rows by updated_at
+        last_seq = state[2]
+        checkpoint = datetime.fromisoformat(state[1].replace('Z', '+00:00'))
+        since = (checkpoint - CHECKPOINT_OVERLAP).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+        print(f"Incremental scan of encounters added after #{last_seq} or updated since {since}")
+
+    # Separate connection for reading so chunk commits don't disturb the cursor
+    reader = sqlite3.connect(DB_PATH)
+    encounters = reader.execute("""
+        SELECT id, student_id,
+               assessment || ' ' || COALESCE(subjective, '') || ' ' || COALESCE(objective, ''),
+               actions_taken, disposition, updated_at, seq
+        FROM encounters
+        WHERE seq > ? OR updated_at >= ?
+        ORDER BY seq
+    """, [last_seq, since])
+
+    start_time = time.time()
+    scanned = 0
+    found = 0
+    checkpoint = state[1] if state and since else ''
+
+    # Chunks in flight at once, so memory stays flat however many encounters changed
+    batch_size = (workers or os.cpu_count() or 1) * 2
+    chunks = read_chunks(encounters, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(medications, conditions)) as pool:
+        while True:
+            pending = [chunk for _, chunk in zip(range(batch_size), chunks)]
+            if not pending:
+                break
+
+            results = pool.map(detect_triggers, [[row[:5] for row in chunk] for chunk in pending])
+            for chunk, rows in zip(pending, results):
+                ids = [(row[0],) for row in chunk]
+                cursor.executemany("DELETE FROM encounter_hsp_triggers WHERE encounter_id = ?", ids)
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO encounter_hsp_triggers
+                    (encounter_id, trigger_type, term, student_id, confidence, description)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+
+                # Rows come in seq order, so everything up to last_seq is done
+                checkpoint = max([checkpoint] + [row[5] for row in chunk])
+                last_seq = max(last_seq, chunk[-1][6])
+                cursor.execute("""
+                    INSERT INTO hsp_scan_state (id, ruleset_hash, checkpoint, last_seq, scanned_at)
+                    VALUES (1, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(id) DO UPDATE SET
+                        ruleset_hash = excluded.ruleset_hash,
+                        checkpoint = excluded.checkpoint,
+                        last_seq = excluded.last_seq,
+                        scanned_at = excluded.scanned_at
+                """, [rules, checkpoint, last_seq])
+                conn.commit()  # Triggers and checkpoint move together
+
+                scanned += len(chunk)
+                found += len(rows)
+
+    if not since and scanned == 0:
+        # Nothing to scan yet; still record the ruleset so the next run is incremental
+        cursor.execute("""
+            INSERT OR REPLACE INTO hsp_scan_state (id, ruleset_hash, checkpoint)
+            VALUES (1, ?, '')
+        """, [rules])
+        conn.commit()
+
+    reader.close()
+    conn.close()
+
+    elapsed = time.time() - start_time
+    print(f"✓ Scanned {scanned:,} encounters in {elapsed:.2f} seconds")
+    print(f"✓ Recorded {found:,} triggers")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Batch HSP trigger detection for Aspen-Lite encounters",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Scan encounters changed since the last run
+  python3 scripts/detect_hsp_triggers.py
+
+  # Rescan everything with 4 worker processes
+  python3 scripts/detect_hsp_triggers.py --full --workers 4
+        """
+    )
+
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Rescan all encounters, ignoring the checkpoint'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes (default: CPU count)'
+    )
+
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=500,
+        help='Encounters per worker task (default: 500)'
+    )
+
+    args = parser.parse_args()
+
+    if not Path(DB_PATH).exists():
+        print(f"Error: Database not found at {DB_PATH}")
+        print("Run: python3 scripts/migrate_data.py --init")
+        return 1
+
+    run_detection(full=args.full, workers=args.workers, chunk_size=args.chunk_size)
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -7,6 +7,13 @@ Handles:
 - JSON import to SQLite
 - Data verification
 - Performance testing
+- Columnar analytics snapshots (requires pyarrow)
+- Compact (dictionary-encoded) student storage
+- Encounter import from the legacy JSON store
+- Encounter statistics rollup rebuilds
+- Demographic summary cube (school x grade x gender x ethnicity counts)
+- Delta imports of changed students
+- Concurrent read/write benchmark (--verify)
 
 Usage:
     # Initialize database
@@ -15,8 +22,23 @@ Usage:
     # Import data from JSON
     python3 migrate_data.py --import data/generated_students.json
 
-    # Verify data integrity
-    python3 migrate_data.py --verify
+    # Verify data integrity and benchmark concurrent readers (+ a writer)
+    python3 migrate_data.py --verify --readers 8 --writer
+
+    # Apply changed students only
+    python3 migrate_data.py --import-delta data/changed_students.json
+
+    # Rebuild the columnar analytics snapshot
+    python3 migrate_data.py --snapshot
+
+    # Convert to compact dictionary-encoded storage
+    python3 migrate_data.py --compact
+
+    # Move encounters from the Next.js JSON file into SQLite (one time)
+    python3 migrate_data.py --import-encounters data/encounters.json
+
+    # Rebuild encounter statistics rollups and the demographic cube from scratch
+    python3 migrate_data.py --rebuild-stats
 
     # All in one
     python3 migrate_data.py --init --import data/generated_students.json --verify
@@ -25,21 +47,27 @@ Usage:
 import sqlite3
 import json
 import argparse
+import os
+import random
+import tempfile
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-DB_PATH = 'data/aspen.db'
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Columnar snapshots are optional
+    pa = None
 
-SCHEMA_SQL = """
--- Schools table
-CREATE TABLE IF NOT EXISTS schools (
-  id INTEGER PRIMARY KEY AUTOINCREMENT,
-  name TEXT NOT NULL UNIQUE,
-  address TEXT,
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+DB_PATH = 'data/aspen.db'
+SNAPSHOT_DIR = 'data/snapshots'
 
+# Row layout for students; compacted databases use COMPACT_SCHEMA_SQL and
+# COMPACT_VIEW_SQL instead, so --init never touches the view
+STUDENTS_SCHEMA_SQL = """
 -- Students table
 CREATE TABLE IF NOT EXISTS students (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -64,6 +92,198 @@ CREATE INDEX IF NOT EXISTS idx_students_name ON students(last_name, first_name);
 CREATE INDEX IF NOT EXISTS idx_students_grade ON students(grade);
 CREATE INDEX IF NOT EXISTS idx_students_gender ON students(gender);
 CREATE INDEX IF NOT EXISTS idx_students_ethnicity ON students(ethnicity);
+"""
+
+SCHEMA_SQL = """
+-- Schools table
+CREATE TABLE IF NOT EXISTS schools (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE,
+  address TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Data version (bumped on every import so the API can invalidate in-memory state)
+CREATE TABLE IF NOT EXISTS data_version (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  version INTEGER NOT NULL,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Encounters (nurse visits). seq orders rows for keyset pagination.
+CREATE TABLE IF NOT EXISTS encounters (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  id TEXT NOT NULL UNIQUE,
+  student_id TEXT NOT NULL,
+  school_id TEXT,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL,
+  chief_complaint TEXT,
+  subjective TEXT,
+  objective TEXT,
+  assessment TEXT NOT NULL,
+  actions_taken TEXT NOT NULL DEFAULT '[]',
+  disposition TEXT NOT NULL,
+  quick_tags TEXT NOT NULL DEFAULT '[]',
+  follow_up_needed INTEGER NOT NULL DEFAULT 0,
+  follow_up_date TEXT,
+  follow_up_notes TEXT,
+  triggered_hsp_prompt INTEGER NOT NULL DEFAULT 0,
+  hsp_prompt_action TEXT,
+  hsp_dismiss_reason TEXT,
+  duration INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_encounters_student_created ON encounters(student_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_encounters_school_created ON encounters(school_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_encounters_created ON encounters(created_at);
+CREATE INDEX IF NOT EXISTS idx_encounters_updated ON encounters(updated_at);
+
+-- HSP update triggers detected in encounters (scripts/detect_hsp_triggers.py)
+CREATE TABLE IF NOT EXISTS encounter_hsp_triggers (
+  encounter_id TEXT NOT NULL,
+  trigger_type TEXT NOT NULL,
+  term TEXT NOT NULL,
+  student_id TEXT NOT NULL,
+  confidence TEXT NOT NULL,
+  description TEXT NOT NULL,
+  PRIMARY KEY (encounter_id, trigger_type, term)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_encounter_hsp_triggers_student ON encounter_hsp_triggers(student_id);
+CREATE INDEX IF NOT EXISTS idx_encounter_hsp_triggers_type ON encounter_hsp_triggers(trigger_type, term);
+
+-- Trigger detection checkpoint: encounters updated after this are rescanned
+CREATE TABLE IF NOT EXISTS hsp_scan_state (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  ruleset_hash TEXT NOT NULL,
+  checkpoint TEXT NOT NULL,
+  last_seq INTEGER NOT NULL DEFAULT 0,
+  scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Encounter statistics rollups per school and UTC day. Kept current by the
+-- API on every encounter write; rebuilt from encounters with --rebuild-stats.
+CREATE TABLE IF NOT EXISTS encounter_daily_stats (
+  school_id TEXT NOT NULL,
+  day TEXT NOT NULL,
+  encounters INTEGER NOT NULL DEFAULT 0,
+  duration_total INTEGER NOT NULL DEFAULT 0,
+  duration_count INTEGER NOT NULL DEFAULT 0,
+  hsp_triggered INTEGER NOT NULL DEFAULT 0,
+  hsp_reviewed INTEGER NOT NULL DEFAULT 0,
+  hsp_dismissed INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (school_id, day)
+) WITHOUT ROWID;
+
+-- Chief complaint and disposition counts
+CREATE TABLE IF NOT EXISTS encounter_daily_counts (
+  school_id TEXT NOT NULL,
+  day TEXT NOT NULL,
+  dimension TEXT NOT NULL,
+  value TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (school_id, day, dimension, value)
+) WITHOUT ROWID;
+
+-- Students seen per day, for exact unique-student counts over a range
+CREATE TABLE IF NOT EXISTS encounter_daily_students (
+  school_id TEXT NOT NULL,
+  day TEXT NOT NULL,
+  student_id TEXT NOT NULL,
+  visits INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (school_id, day, student_id)
+) WITHOUT ROWID;
+
+-- District-wide (all schools) range lookups
+CREATE INDEX IF NOT EXISTS idx_encounter_daily_stats_day ON encounter_daily_stats(day);
+CREATE INDEX IF NOT EXISTS idx_encounter_daily_counts_day ON encounter_daily_counts(day);
+CREATE INDEX IF NOT EXISTS idx_encounter_daily_students_day ON encounter_daily_students(day, student_id);
+
+-- Student counts for every combination of school, grade, gender and
+-- ethnicity, and every roll-up of them. `dimensions` is a bitmask of the
+-- columns a row breaks counts down by (see CUBE_DIMENSIONS); the other
+-- columns hold '' and count across all their values. Rebuilt on --import
+-- and --rebuild-stats, kept current by --import-delta.
+CREATE TABLE IF NOT EXISTS demographic_cube (
+  dimensions INTEGER NOT NULL,
+  school_id INTEGER NOT NULL,
+  grade INTEGER NOT NULL,
+  gender TEXT NOT NULL,
+  ethnicity TEXT NOT NULL,
+  students INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (dimensions, school_id, grade, gender, ethnicity)
+) WITHOUT ROWID;
+
+-- Read-through cache for external system lookups
+-- (see docs/database/integration-schema.sql)
+CREATE TABLE IF NOT EXISTS integration_cache (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  cache_key TEXT NOT NULL UNIQUE,
+  data TEXT NOT NULL,
+  data_hash TEXT,
+  source TEXT NOT NULL,
+  resource_type TEXT NOT NULL,
+  resource_id TEXT,
+  cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  expires_at TIMESTAMP NOT NULL,
+  hit_count INTEGER DEFAULT 0,
+  last_accessed TIMESTAMP,
+  is_stale BOOLEAN DEFAULT 0,
+  checksum TEXT,
+  CHECK (source IN ('icare', 'ssm', 'isbe', 'local'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_integration_cache_expires ON integration_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_integration_cache_source_resource
+    ON integration_cache(source, resource_type, resource_id);
+CREATE INDEX IF NOT EXISTS idx_integration_cache_stale ON integration_cache(is_stale, expires_at);
+
+-- Integration metrics, pre-aggregated into time buckets by the API. Raw
+-- one-minute buckets are rolled up into hourly and then daily buckets as they
+-- age (see docs/database/integration-schema.sql for the original design).
+CREATE TABLE IF NOT EXISTS integration_metrics (
+  integration_name TEXT NOT NULL,
+  metric_name TEXT NOT NULL,
+  window_seconds INTEGER NOT NULL,
+  bucket_start TIMESTAMP NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  total REAL NOT NULL DEFAULT 0,
+  min REAL,
+  max REAL,
+  PRIMARY KEY (integration_name, metric_name, window_seconds, bucket_start)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_integration_metrics_window ON integration_metrics(window_seconds, bucket_start);
+
+-- FERPA audit trail: one row per student record viewed or exported, written
+-- in batches by the API's background audit writer. Only the indexes the
+-- compliance queries need, since every row pays for each one on insert.
+CREATE TABLE IF NOT EXISTS ferpa_audit_logs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id TEXT NOT NULL,
+  user_email TEXT,
+  user_role TEXT,
+  student_id TEXT NOT NULL,
+  action TEXT NOT NULL,
+  resource_type TEXT NOT NULL,
+  ferpa_classification TEXT NOT NULL,
+  fields_accessed TEXT,
+  ip_address TEXT,
+  user_agent TEXT,
+  session_id TEXT,
+  data_source TEXT,
+  timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  access_reason TEXT,
+  CHECK (action IN ('view', 'export', 'edit', 'delete', 'print')),
+  CHECK (ferpa_classification IN ('directory', 'educational', 'sensitive')),
+  CHECK (data_source IN ('local', 'icare', 'ssm', 'isbe'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_ferpa_audit_user ON ferpa_audit_logs(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_ferpa_audit_student_timestamp ON ferpa_audit_logs(student_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_ferpa_audit_timestamp ON ferpa_audit_logs(timestamp);
 
 -- View for student counts by school
 CREATE VIEW IF NOT EXISTS school_student_counts AS
@@ -72,6 +292,173 @@ FROM students
 GROUP BY school_id;
 """
 
+# Compact layout: gender, ethnicity and address are stored as small integer
+# codes in student_records, and `students` becomes a view that decodes them,
+# so every existing query keeps working and returns the same strings.
+# Lookup tables are WITHOUT ROWID (tiny, always read by primary key);
+# student_records keeps its rowid so secondary indexes stay narrow.
+COMPACT_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS genders (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ethnicities (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS addresses (
+  id INTEGER PRIMARY KEY,
+  address TEXT,
+  zip_code TEXT,
+  UNIQUE (address, zip_code)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS student_records (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  student_id TEXT NOT NULL UNIQUE,
+  first_name TEXT NOT NULL,
+  last_name TEXT NOT NULL,
+  grade INTEGER NOT NULL,
+  gender_id INTEGER NOT NULL REFERENCES genders(id),
+  ethnicity_id INTEGER NOT NULL REFERENCES ethnicities(id),
+  school_id INTEGER NOT NULL,
+  address_id INTEGER REFERENCES addresses(id),
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (school_id) REFERENCES schools(id) ON DELETE CASCADE
+);
+
+-- Record of each conversion, reported by --verify
+CREATE TABLE IF NOT EXISTS compaction_log (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  compacted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  size_before INTEGER NOT NULL,
+  size_after INTEGER
+);
+"""
+
+COMPACT_VIEW_SQL = """
+-- Performance indexes (student_id is already covered by its UNIQUE constraint)
+CREATE INDEX IF NOT EXISTS idx_students_school_id ON student_records(school_id);
+CREATE INDEX IF NOT EXISTS idx_students_name ON student_records(last_name, first_name);
+CREATE INDEX IF NOT EXISTS idx_students_grade ON student_records(grade);
+CREATE INDEX IF NOT EXISTS idx_students_gender ON student_records(gender_id);
+CREATE INDEX IF NOT EXISTS idx_students_ethnicity ON student_records(ethnicity_id);
+
+-- Decoded view with the original students columns
+CREATE VIEW IF NOT EXISTS students AS
+SELECT r.id, r.student_id, r.first_name, r.last_name, r.grade,
+       g.name AS gender, e.name AS ethnicity, r.school_id,
+       a.address, a.zip_code, r.created_at, r.updated_at
+FROM student_records r
+JOIN genders g ON g.id = r.gender_id
+JOIN ethnicities e ON e.id = r.ethnicity_id
+LEFT JOIN addresses a ON a.id = r.address_id;
+
+-- Writes through the view encode new values on the fly
+CREATE TRIGGER IF NOT EXISTS trg_students_insert
+INSTEAD OF INSERT ON students
+BEGIN
+    INSERT INTO genders (id, name)
+    SELECT (SELECT COALESCE(MAX(id), 0) + 1 FROM genders), NEW.gender
+    WHERE NOT EXISTS (SELECT 1 FROM genders WHERE name = NEW.gender);
+
+    INSERT INTO ethnicities (id, name)
+    SELECT (SELECT COALESCE(MAX(id), 0) + 1 FROM ethnicities), NEW.ethnicity
+    WHERE NOT EXISTS (SELECT 1 FROM ethnicities WHERE name = NEW.ethnicity);
+
+    INSERT INTO addresses (id, address, zip_code)
+    SELECT (SELECT COALESCE(MAX(id), 0) + 1 FROM addresses), NEW.address, NEW.zip_code
+    WHERE NOT EXISTS (
+        SELECT 1 FROM addresses WHERE address IS NEW.address AND zip_code IS NEW.zip_code
+    );
+
+    INSERT INTO student_records
+    (student_id, first_name, last_name, grade, gender_id, ethnicity_id, school_id, address_id)
+    VALUES (
+        NEW.student_id, NEW.first_name, NEW.last_name, NEW.grade,
+        (SELECT id FROM genders WHERE name = NEW.gender),
+        (SELECT id FROM ethnicities WHERE name = NEW.ethnicity),
+        NEW.school_id,
+        (SELECT id FROM addresses WHERE address IS NEW.address AND zip_code IS NEW.zip_code)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_students_delete
+INSTEAD OF DELETE ON students
+BEGIN
+    DELETE FROM student_records WHERE id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_students_update
+INSTEAD OF UPDATE ON students
+BEGIN
+    INSERT INTO genders (id, name)
+    SELECT (SELECT COALESCE(MAX(id), 0) + 1 FROM genders), NEW.gender
+    WHERE NOT EXISTS (SELECT 1 FROM genders WHERE name = NEW.gender);
+
+    INSERT INTO ethnicities (id, name)
+    SELECT (SELECT COALESCE(MAX(id), 0) + 1 FROM ethnicities), NEW.ethnicity
+    WHERE NOT EXISTS (SELECT 1 FROM ethnicities WHERE name = NEW.ethnicity);
+
+    INSERT INTO addresses (id, address, zip_code)
+    SELECT (SELECT COALESCE(MAX(id), 0) + 1 FROM addresses), NEW.address, NEW.zip_code
+    WHERE NOT EXISTS (
+        SELECT 1 FROM addresses WHERE address IS NEW.address AND zip_code IS NEW.zip_code
+    );
+
+    UPDATE student_records SET
+        id = NEW.id,
+        student_id = NEW.student_id,
+        first_name = NEW.first_name,
+        last_name = NEW.last_name,
+        grade = NEW.grade,
+        gender_id = (SELECT id FROM genders WHERE name = NEW.gender),
+        ethnicity_id = (SELECT id FROM ethnicities WHERE name = NEW.ethnicity),
+        school_id = NEW.school_id,
+        address_id = (SELECT id FROM addresses WHERE address IS NEW.address AND zip_code IS NEW.zip_code),
+        created_at = NEW.created_at,
+        updated_at = NEW.updated_at
+    WHERE id = OLD.id;
+END;
+"""
+
+# Tables (and their indexes) the API reads on every roster request
+STUDENT_TABLES = ('students', 'student_records', 'genders', 'ethnicities', 'addresses', 'schools')
+
+def page_cache_report(conn):
+    """
+    Compare the connection's page cache capacity with the student working set.
+
+    Returns (cache_bytes, working_set_bytes). The working set comes from the
+    dbstat virtual table and is None on SQLite builds without it.
+    """
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+    # Negative cache_size is a size in KiB, positive a page count
+    cache_bytes = -cache_size * 1024 if cache_size < 0 else cache_size * page_size
+
+    try:
+        pages = conn.execute(f"""
+            SELECT COUNT(*) FROM dbstat
+            WHERE name IN (
+                SELECT name FROM sqlite_master
+                WHERE tbl_name IN ({', '.join('?' * len(STUDENT_TABLES))}) AND type IN ('table', 'index')
+            )
+        """, STUDENT_TABLES).fetchone()[0]
+    except sqlite3.OperationalError:
+        return cache_bytes, None  # No dbstat in this SQLite build
+
+    return cache_bytes, pages * page_size
+
+def is_compact(cursor):
+    """Check whether the database uses the compact student layout."""
+    cursor.execute("SELECT type FROM sqlite_master WHERE name = 'students'")
+    row = cursor.fetchone()
+    return row is not None and row[0] == 'view'
+
 def init_database():
     """Initialize the database with schema."""
     print(f"Initializing database at {DB_PATH}...")
@@ -82,19 +469,142 @@ def init_database():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
-    # Execute schema
+    # WAL lets API reads proceed while encounters are being written
+    cursor.execute("PRAGMA journal_mode=WAL")
+
+    # Execute schema; a compacted database keeps its view and triggers
+    if is_compact(cursor):
+        cursor.executescript(COMPACT_SCHEMA_SQL + COMPACT_VIEW_SQL)
+    else:
+        cursor.executescript(STUDENTS_SCHEMA_SQL)
     cursor.executescript(SCHEMA_SQL)
     conn.commit()
 
     print("✓ Database initialized")
-    print("✓ Tables created: schools, students")
+    print("✓ Tables created: schools, students, data_version, encounters, demographic_cube")
     print("✓ Indexes created for performance")
     print("✓ Views created: school_student_counts")
 
     conn.close()
 
+# Tables an import writes to; missing ones mean --init hasn't been run since they were added
+IMPORT_TABLES = ('schools', 'students', 'data_version', 'demographic_cube')
+
+def check_import_schema(cursor):
+    """
+    Check that every IMPORT_TABLES table exists before anything is written.
+
+    Prints what's missing and returns False, so an import into an
+    un-migrated database fails up front instead of after committing rows.
+    """
+    cursor.execute(f"""
+        SELECT name FROM sqlite_master
+        WHERE name IN ({', '.join('?' * len(IMPORT_TABLES))}) AND type IN ('table', 'view')
+    """, IMPORT_TABLES)
+    missing = sorted(set(IMPORT_TABLES) - {name for (name,) in cursor.fetchall()})
+    if missing:
+        print(f"❌ Database is missing tables: {', '.join(missing)}")
+        print("Run: python3 scripts/migrate_data.py --init")
+        return False
+    return True
+
+def bump_data_version(cursor):
+    """Increment the data version so running API servers rebuild their caches."""
+    cursor.execute("""
+        INSERT INTO data_version (id, version, updated_at)
+        VALUES (1, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT(id) DO UPDATE SET
+            version = version + 1,
+            updated_at = CURRENT_TIMESTAMP
+    """)
+
+# demographic_cube columns; bit i of `dimensions` set means the row is broken
+# down by CUBE_DIMENSIONS[i]. Must match DEMOGRAPHIC_CUBE_COLUMNS in server_v2.py
+CUBE_DIMENSIONS = ('school_id', 'grade', 'gender', 'ethnicity')
+CUBE_ALL = ''  # Value of a rolled-up column
+CUBE_BASE = (1 << len(CUBE_DIMENSIONS)) - 1  # Rows broken down by every dimension
+
+def rebuild_demographic_cube(cursor):
+    """
+    Recompute demographic_cube from the students table.
+
+    The fully broken-down rows come from one GROUP BY over students; every
+    roll-up is then summed from those rather than from students again.
+    """
+    columns = ', '.join(CUBE_DIMENSIONS)
+    rolled_up = ', '.join(
+        f"CASE WHEN mask & {1 << i} THEN {column} ELSE '{CUBE_ALL}' END"
+        for i, column in enumerate(CUBE_DIMENSIONS)
+    )
+
+    cursor.execute("DELETE FROM demographic_cube")
+    cursor.execute(f"""
+        INSERT INTO demographic_cube (dimensions, {columns}, students)
+        SELECT {CUBE_BASE}, {columns}, COUNT(*)
+        FROM students
+        GROUP BY {columns}
+    """)
+    cursor.execute(f"""
+        INSERT INTO demographic_cube (dimensions, {columns}, students)
+        WITH RECURSIVE masks(mask) AS (
+            SELECT 0 UNION ALL SELECT mask + 1 FROM masks WHERE mask + 1 < {CUBE_BASE}
+        )
+        SELECT mask, {rolled_up}, SUM(students)
+        FROM demographic_cube, masks
+        WHERE dimensions = {CUBE_BASE}
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+
+def update_demographic_cube(cursor, changes):
+    """
+    Apply per-cell student count changes to demographic_cube.
+
+    changes maps (school_id, grade, gender, ethnicity) to the number of
+    students added (or, if negative, removed) in that cell. Each change is
+    applied to the cell and every roll-up containing it; rows left at zero
+    are dropped.
+    """
+    rows = {}
+    for cell, change in changes.items():
+        if not change:
+            continue
+        for mask in range(CUBE_BASE + 1):
+            key = (mask,) + tuple(value if mask & (1 << i) else CUBE_ALL
+                                  for i, value in enumerate(cell))
+            rows[key] = rows.get(key, 0) + change
+
+    columns = ', '.join(CUBE_DIMENSIONS)
+    cursor.executemany(f"""
+        INSERT INTO demographic_cube (dimensions, {columns}, students)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (dimensions, {columns}) DO UPDATE SET
+            students = students + excluded.students
+    """, [key + (change,) for key, change in rows.items() if change])
+
+    cursor.executemany(f"""
+        DELETE FROM demographic_cube
+        WHERE dimensions = ? AND {' AND '.join(f'{column} = ?' for column in CUBE_DIMENSIONS)}
+          AND students <= 0
+    """, [key for key, change in rows.items() if change < 0])
+
+def rebuild_demographic_stats():
+    """Recompute the demographic cube from the students table."""
+    print("\nRebuilding demographic cube...")
+    start_time = time.time()
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    rebuild_demographic_cube(cursor)
+    conn.commit()
+
+    rows = cursor.execute("SELECT COUNT(*) FROM demographic_cube").fetchone()[0]
+    conn.close()
+
+    elapsed = time.time() - start_time
+    print(f"✓ Rebuilt {rows:,} cube rows in {elapsed:.2f} seconds")
+
 def import_json_data(json_file):
-    """Import student data from JSON file."""
+    """Import student data from JSON file, in one transaction."""
     print(f"\nImporting data from {json_file}...")
 
     # Load JSON
@@ -106,6 +616,10 @@ def import_json_data(json_file):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
+    if not check_import_schema(cursor):
+        conn.close()
+        return False
+
     # Extract unique schools
     schools = {}
     for student in students_data:
@@ -122,7 +636,6 @@ def import_json_data(json_file):
             "INSERT OR IGNORE INTO schools (name) VALUES (?)",
             (school_name,)
         )
-    conn.commit()
 
     # Get school IDs
     cursor.execute("SELECT id, name FROM schools")
@@ -160,7 +673,6 @@ def import_json_data(json_file):
                 for s in batch
             ]
         )
-        conn.commit()
 
         progress = min(i + batch_size, total)
         pct = (progress / total) * 100
@@ -169,11 +681,447 @@ def import_json_data(json_file):
     end_time = time.time()
     elapsed = end_time - start_time
 
+    # Students, cube and data version commit together: a failed import leaves
+    # nothing behind, and the API never reads a stale cube as current
+    cube_start = time.time()
+    rebuild_demographic_cube(cursor)
+    bump_data_version(cursor)
+    conn.commit()
+
     print(f"\n✓ Imported {total:,} students in {elapsed:.2f} seconds")
     print(f"✓ Rate: {total / elapsed:.0f} students/second")
+    print(f"✓ Built demographic cube in {time.time() - cube_start:.2f} seconds")
+
+    conn.close()
+
+    export_snapshot()
+    return True
+
+def apply_student_delta(cursor, students, school_id_map):
+    """
+    Apply a batch of changed students: each is updated in place (or added),
+    or removed when it has "deleted": true. Updated students keep their row
+    id and created_at. Works through the students view in the compact
+    layout too. demographic_cube is updated in the same transaction.
+    """
+    # A student listed twice takes its last entry
+    students = list({s['studentId']: s for s in students}.values())
+
+    for student in students:
+        if student['school'] not in school_id_map and not student.get('deleted'):
+            cursor.execute("INSERT OR IGNORE INTO schools (name) VALUES (?)", (student['school'],))
+            cursor.execute("SELECT id FROM schools WHERE name = ?", (student['school'],))
+            school_id_map[student['school']] = cursor.fetchone()[0]
+
+    # Cube changes: the stored students leave their cells, the new versions join theirs
+    changes = Counter()
+    cursor.execute(f"""
+        SELECT student_id, {', '.join(CUBE_DIMENSIONS)} FROM students
+        WHERE student_id IN (SELECT value FROM json_each(?))
+    """, (json.dumps([s['studentId'] for s in students]),))
+    existing = set()
+    for student_id, *cell in cursor.fetchall():
+        existing.add(student_id)
+        changes[tuple(cell)] -= 1
+    for s in students:
+        if not s.get('deleted'):
+            changes[(school_id_map[s['school']], s['grade'], s['gender'], s['ethnicity'])] += 1
+
+    cursor.execute(
+        "DELETE FROM students WHERE student_id IN (SELECT value FROM json_each(?))",
+        (json.dumps([s['studentId'] for s in students if s.get('deleted')]),)
+    )
+
+    def values(s):
+        return (s['firstName'], s['lastName'], s['grade'], s['gender'], s['ethnicity'],
+                school_id_map[s['school']], s['address'], s['zipCode'], s['studentId'])
+
+    cursor.executemany(
+        """
+        UPDATE students SET
+            first_name = ?, last_name = ?, grade = ?, gender = ?, ethnicity = ?,
+            school_id = ?, address = ?, zip_code = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE student_id = ?
+        """,
+        [values(s) for s in students if not s.get('deleted') and s['studentId'] in existing]
+    )
+
+    cursor.executemany(
+        """
+        INSERT INTO students
+        (first_name, last_name, grade, gender, ethnicity, school_id, address, zip_code, student_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [values(s) for s in students if not s.get('deleted') and s['studentId'] not in existing]
+    )
+
+    update_demographic_cube(cursor, changes)
+
+def import_delta(json_file):
+    """
+    Import changed students from a JSON file in the --import format.
+
+    Students in the file replace the stored record with the same studentId
+    (or are added); entries with "deleted": true are removed. Students not
+    in the file are left alone.
+    """
+    print(f"\nImporting changes from {json_file}...")
+
+    with open(json_file, 'r') as f:
+        students_data = json.load(f)
+
+    print(f"Loaded {len(students_data):,} changed students from JSON")
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    if not check_import_schema(cursor):
+        conn.close()
+        return False
+
+    cursor.execute("SELECT id, name FROM schools")
+    school_id_map = {name: id for id, name in cursor.fetchall()}
+
+    start_time = time.time()
+    batch_size = 1000
+
+    # One transaction, so the API never sees half a delta
+    for i in range(0, len(students_data), batch_size):
+        apply_student_delta(cursor, students_data[i:i + batch_size], school_id_map)
+
+    bump_data_version(cursor)
+    conn.commit()
+    conn.close()
+
+    removed = sum(1 for s in students_data if s.get('deleted'))
+    elapsed = time.time() - start_time
+    print(f"✓ Applied {len(students_data) - removed:,} updates and {removed:,} removals "
+          f"in {elapsed:.2f} seconds")
+
+    export_snapshot()
+    return True
+
+def export_snapshot():
+    """
+    Write a columnar snapshot of student demographics for analytics.
+
+    Produces two files in SNAPSHOT_DIR:
+    - students.arrow: uncompressed Arrow IPC, memory-mapped by the API server
+    - students.parquet: zstd-compressed Parquet for analysts' own tooling
+
+    String columns are dictionary-encoded in both. Names and addresses are
+    left out; the snapshot only carries what demographic reports need.
+    """
+    if pa is None:
+        print("\n⚠ pyarrow not installed; skipping columnar snapshot")
+        return
+
+    print(f"\nWriting columnar snapshot to {SNAPSHOT_DIR}...")
+    start_time = time.time()
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        version_row = cursor.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        version_row = None
+    version = version_row[0] if version_row else 0
+
+    cursor.execute("""
+        SELECT st.school_id, s.name, st.grade, st.gender, st.ethnicity, st.zip_code
+        FROM students st
+        JOIN schools s ON s.id = st.school_id
+        ORDER BY st.school_id
+    """)
+
+    columns = ([], [], [], [], [], [])
+    while True:
+        rows = cursor.fetchmany(10000)
+        if not rows:
+            break
+        for row in rows:
+            for column, value in zip(columns, row):
+                column.append(value)
 
     conn.close()
 
+    school_ids, school_names, grades, genders, ethnicities, zip_codes = columns
+    table = pa.table(
+        {
+            'school_id': pa.array(school_ids, pa.int32()),
+            'school': pa.array(school_names, pa.string()).dictionary_encode(),
+            'grade': pa.array(grades, pa.int8()),
+            'gender': pa.array(genders, pa.string()).dictionary_encode(),
+            'ethnicity': pa.array(ethnicities, pa.string()).dictionary_encode(),
+            'zip_code': pa.array(zip_codes, pa.string()).dictionary_encode(),
+        },
+        metadata={'data_version': str(version)}
+    )
+
+    snapshot_dir = Path(SNAPSHOT_DIR)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    # Write to temp files and rename so readers never see a partial snapshot
+    arrow_path = snapshot_dir / 'students.arrow'
+    tmp_path = snapshot_dir / 'students.arrow.tmp'
+    with pa.OSFile(str(tmp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+
+    parquet_path = snapshot_dir / 'students.parquet'
+    tmp_path = snapshot_dir / 'students.parquet.tmp'
+    pq.write_table(table, str(tmp_path), compression='zstd', use_dictionary=True)
+    os.replace(tmp_path, parquet_path)
+
+    elapsed = time.time() - start_time
+    arrow_mb = arrow_path.stat().st_size / (1024 * 1024)
+    parquet_mb = parquet_path.stat().st_size / (1024 * 1024)
+
+    print(f"✓ Snapshot of {table.num_rows:,} students (data version {version}) in {elapsed:.2f} seconds")
+    print(f"  - {arrow_path}: {arrow_mb:.2f} MB")
+    print(f"  - {parquet_path}: {parquet_mb:.2f} MB")
+
+def import_encounters(json_file):
+    """
+    Import encounters from the legacy JSON store written by the Next.js routes.
+
+    Safe to re-run: encounters whose id is already present are skipped.
+    """
+    print(f"\nImporting encounters from {json_file}...")
+
+    with open(json_file, 'r') as f:
+        encounters = json.load(f)
+
+    print(f"Loaded {len(encounters):,} encounters from JSON")
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    before = cursor.execute("SELECT COUNT(*) FROM encounters").fetchone()[0]
+
+    # Oldest first so seq follows creation order
+    encounters.sort(key=lambda e: e['createdAt'])
+
+    cursor.executemany(
+        """
+        INSERT OR IGNORE INTO encounters
+        (id, student_id, school_id, created_at, updated_at, chief_complaint, subjective,
+         objective, assessment, actions_taken, disposition, quick_tags, follow_up_needed,
+         follow_up_date, follow_up_notes, triggered_hsp_prompt, hsp_prompt_action,
+         hsp_dismiss_reason, duration)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                e['id'],
+                e['studentId'],
+                e.get('schoolId'),
+                e['createdAt'],
+                e.get('updatedAt') or e['createdAt'],
+                e.get('chiefComplaint'),
+                e.get('subjective'),
+                e.get('objective'),
+                e['assessment'],
+                json.dumps(e.get('actionsTaken') or []),
+                e['disposition'],
+                json.dumps(e.get('quickTags') or []),
+                int(bool(e.get('followUpNeeded'))),
+                e.get('followUpDate'),
+                e.get('followUpNotes'),
+                int(bool(e.get('triggeredHspPrompt'))),
+                e.get('hspPromptAction'),
+                e.get('hspDismissReason'),
+                e.get('duration')
+            )
+            for e in encounters
+        ]
+    )
+    conn.commit()
+
+    after = cursor.execute("SELECT COUNT(*) FROM encounters").fetchone()[0]
+    conn.close()
+
+    print(f"✓ Imported {after - before:,} encounters ({len(encounters) - (after - before):,} already present)")
+
+    rebuild_encounter_stats()
+
+ENCOUNTER_ROLLUP_TABLES = ('encounter_daily_stats', 'encounter_daily_counts', 'encounter_daily_students')
+
+def rebuild_encounter_rollups(cursor):
+    """
+    Recompute the encounter statistics rollups from the encounters table.
+
+    Runs in the caller's transaction. Must match apply_encounter_rollups()
+    in server_v2.py.
+    """
+    for table in ENCOUNTER_ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+
+    cursor.execute("""
+        INSERT INTO encounter_daily_stats
+        (school_id, day, encounters, duration_total, duration_count,
+         hsp_triggered, hsp_reviewed, hsp_dismissed)
+        SELECT COALESCE(school_id, ''), substr(created_at, 1, 10), COUNT(*),
+               SUM(CASE WHEN duration > 0 THEN duration ELSE 0 END),
+               SUM(CASE WHEN duration > 0 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN triggered_hsp_prompt THEN 1 ELSE 0 END),
+               SUM(CASE WHEN hsp_prompt_action = 'reviewed' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN hsp_prompt_action = 'dismissed' THEN 1 ELSE 0 END)
+        FROM encounters
+        GROUP BY 1, 2
+    """)
+
+    for dimension, column in (('chief_complaint', 'chief_complaint'), ('disposition', 'disposition')):
+        cursor.execute(f"""
+            INSERT INTO encounter_daily_counts (school_id, day, dimension, value, count)
+            SELECT COALESCE(school_id, ''), substr(created_at, 1, 10), ?,
+                   COALESCE({column}, ''), COUNT(*)
+            FROM encounters
+            GROUP BY 1, 2, 4
+        """, [dimension])
+
+    cursor.execute("""
+        INSERT INTO encounter_daily_students (school_id, day, student_id, visits)
+        SELECT COALESCE(school_id, ''), substr(created_at, 1, 10), student_id, COUNT(*)
+        FROM encounters
+        GROUP BY 1, 2, 3
+    """)
+
+def read_encounter_rollups(cursor):
+    """Snapshot the rollup tables as {primary key: values}, ignoring rows emptied by deletes."""
+    queries = {
+        'encounter_daily_stats': ("""
+            SELECT school_id, day, encounters, duration_total, duration_count,
+                   hsp_triggered, hsp_reviewed, hsp_dismissed
+            FROM encounter_daily_stats WHERE encounters != 0
+        """, 2),
+        'encounter_daily_counts': ("""
+            SELECT school_id, day, dimension, value, count
+            FROM encounter_daily_counts WHERE count != 0
+        """, 4),
+        'encounter_daily_students': ("""
+            SELECT school_id, day, student_id, visits
+            FROM encounter_daily_students WHERE visits != 0
+        """, 3),
+    }
+    return {table: {row[:key]: row[key:] for row in cursor.execute(sql)}
+            for table, (sql, key) in queries.items()}
+
+def check_encounter_rollups(cursor):
+    """
+    Compare the stored rollups with a fresh rebuild.
+
+    The rebuild runs in a savepoint that is rolled back, so nothing changes.
+    Returns {table: number of rows that differ}.
+    """
+    stored = read_encounter_rollups(cursor)
+    cursor.execute("SAVEPOINT check_rollups")
+    try:
+        rebuild_encounter_rollups(cursor)
+        rebuilt = read_encounter_rollups(cursor)
+    finally:
+        cursor.execute("ROLLBACK TO check_rollups")
+        cursor.execute("RELEASE check_rollups")
+
+    return {table: sum(stored[table].get(key) != rebuilt[table].get(key)
+                       for key in stored[table].keys() | rebuilt[table].keys())
+            for table in ENCOUNTER_ROLLUP_TABLES}
+
+def rebuild_encounter_stats():
+    """Recompute all encounter statistics rollups from the encounters table."""
+    print("\nRebuilding encounter statistics rollups...")
+    start_time = time.time()
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute("BEGIN IMMEDIATE")
+    rebuild_encounter_rollups(cursor)
+    conn.commit()
+
+    days = cursor.execute("SELECT COUNT(*) FROM encounter_daily_stats").fetchone()[0]
+    conn.close()
+
+    elapsed = time.time() - start_time
+    print(f"✓ Rebuilt rollups for {days:,} school-days in {elapsed:.2f} seconds")
+
+def database_size(cursor):
+    """
+    Size of the database in bytes, including pages still in the WAL.
+
+    Checkpoints first so the main file on disk matches when nothing else is
+    reading it.
+    """
+    cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+    page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+def compact_database():
+    """
+    Convert the students table to the compact dictionary-encoded layout.
+
+    Existing rows are re-encoded in one transaction, the old table and its
+    indexes are dropped, and the file is vacuumed to reclaim the space.
+    """
+    print(f"\nCompacting student storage in {DB_PATH}...")
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    if is_compact(cursor):
+        print("✓ Database already uses compact storage")
+        conn.close()
+        return
+
+    size_before = database_size(cursor)
+    start_time = time.time()
+
+    cursor.executescript("BEGIN;" + COMPACT_SCHEMA_SQL + """
+        INSERT INTO genders (id, name)
+        SELECT ROW_NUMBER() OVER (ORDER BY gender), gender
+        FROM (SELECT DISTINCT gender FROM students);
+
+        INSERT INTO ethnicities (id, name)
+        SELECT ROW_NUMBER() OVER (ORDER BY ethnicity), ethnicity
+        FROM (SELECT DISTINCT ethnicity FROM students);
+
+        INSERT INTO addresses (id, address, zip_code)
+        SELECT ROW_NUMBER() OVER (ORDER BY zip_code, address), address, zip_code
+        FROM (SELECT DISTINCT address, zip_code FROM students);
+
+        INSERT INTO student_records
+        (id, student_id, first_name, last_name, grade, gender_id, ethnicity_id,
+         school_id, address_id, created_at, updated_at)
+        SELECT s.id, s.student_id, s.first_name, s.last_name, s.grade, g.id, e.id,
+               s.school_id, a.id, s.created_at, s.updated_at
+        FROM students s
+        JOIN genders g ON g.name = s.gender
+        JOIN ethnicities e ON e.name = s.ethnicity
+        LEFT JOIN addresses a ON a.address IS s.address AND a.zip_code IS s.zip_code;
+
+        DROP TABLE students;
+    """ + COMPACT_VIEW_SQL + "COMMIT;")
+
+    bump_data_version(cursor)
+    cursor.execute("INSERT INTO compaction_log (size_before) VALUES (?)", (size_before,))
+    log_id = cursor.lastrowid
+    conn.commit()
+
+    print("Vacuuming...")
+    cursor.execute("VACUUM")
+
+    size_after = database_size(cursor)
+    cursor.execute("UPDATE compaction_log SET size_after = ? WHERE id = ?", (size_after, log_id))
+    conn.commit()
+    conn.close()
+
+    elapsed = time.time() - start_time
+    print(f"✓ Compacted in {elapsed:.2f} seconds")
+    print(f"✓ File size: {size_before / (1024 * 1024):.2f} MB → {size_after / (1024 * 1024):.2f} MB")
+
 def verify_database():
     """Verify database integrity and performance."""
     print("\nVerifying database...")
@@ -206,23 +1154,66 @@ def verify_database():
     for school, count in cursor.fetchall():
         print(f"  {school}: {count} students")
 
+    layout = 'compact (dictionary-encoded)' if is_compact(cursor) else 'standard'
+    print(f"\n✓ Storage layout: {layout}")
+
+    cube_rows, cube_total = cursor.execute("""
+        SELECT COUNT(*), COALESCE(SUM(CASE WHEN dimensions = 0 THEN students END), 0)
+        FROM demographic_cube
+    """).fetchone()
+    if cube_total == student_count:
+        print(f"✓ Demographic cube: {cube_rows:,} rows, totals match")
+    else:
+        print(f"⚠ Demographic cube counts {cube_total:,} students; run --rebuild-stats")
+
+    drift = {table: rows for table, rows in check_encounter_rollups(cursor).items() if rows}
+    if not drift:
+        print("✓ Encounter rollups match the encounters table")
+    else:
+        details = ', '.join(f'{table}: {rows:,} rows' for table, rows in drift.items())
+        print(f"⚠ Encounter rollups differ from a rebuild ({details}); run --rebuild-stats")
+
     # Test query performance
-    print(f"\nTesting query performance...")
+    print(f"\nTesting query performance (cold = first run on a fresh connection)...")
+    conn.close()
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
 
+    # Same shapes the API issues (see scripts/check_query_plans.py for the full set)
+    student_columns = "student_id, first_name, last_name, grade, gender, ethnicity, address, zip_code"
     tests = [
-        ("SELECT * FROM schools", "List all schools"),
-        ("SELECT * FROM students WHERE school_id = 1 LIMIT 50", "Get 50 students from one school"),
-        ("SELECT * FROM students WHERE grade = 9 AND school_id = 1", "Filter by grade"),
-        ("SELECT * FROM students WHERE last_name LIKE 'S%' LIMIT 50", "Search by last name"),
+        ("""SELECT s.id, s.name, COALESCE(c.student_count, 0) FROM schools s
+            LEFT JOIN school_student_counts c ON s.id = c.school_id ORDER BY s.name""",
+         "List all schools"),
+        (f"""SELECT {student_columns} FROM students WHERE school_id = 1
+            ORDER BY last_name, first_name LIMIT 51""",
+         "Get 50 students from one school"),
+        (f"""SELECT {student_columns} FROM students WHERE school_id = 1 AND grade = 9
+            ORDER BY last_name, first_name LIMIT 51""",
+         "Filter by grade"),
+        (f"""SELECT {student_columns} FROM students
+            WHERE first_name LIKE '%an%' OR last_name LIKE '%an%' OR student_id LIKE '%an%'
+            ORDER BY last_name, first_name LIMIT 51""",
+         "Search by name"),
     ]
 
     for query, description in tests:
-        start = time.time()
-        cursor.execute(query)
-        results = cursor.fetchall()
-        elapsed = (time.time() - start) * 1000  # Convert to ms
-
-        print(f"  {description}: {elapsed:.2f}ms ({len(results)} results)")
+        timings = []
+        for _ in range(2):
+            start = time.time()
+            cursor.execute(query)
+            results = cursor.fetchall()
+            timings.append((time.time() - start) * 1000)  # Convert to ms
+
+        print(f"  {description}: {timings[0]:.2f}ms cold, {timings[1]:.2f}ms warm ({len(results)} results)")
+
+    cache_bytes, working_set = page_cache_report(conn)
+    if working_set is None:
+        print(f"  Page cache: {cache_bytes / (1024 * 1024):.1f} MB (student working set unavailable)")
+    else:
+        marker = '✓' if working_set <= cache_bytes else '⚠'
+        print(f"  {marker} Page cache: {cache_bytes / (1024 * 1024):.1f} MB for a "
+              f"{working_set / (1024 * 1024):.1f} MB student working set (tables + indexes)")
 
     # Check indexes
     cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'")
@@ -236,10 +1227,284 @@ def verify_database():
     db_size = Path(DB_PATH).stat().st_size / (1024 * 1024)
     print(f"\n✓ Database file size: {db_size:.2f} MB")
 
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'compaction_log'")
+    if cursor.fetchone():
+        cursor.execute("""
+            SELECT size_before, size_after FROM compaction_log
+            WHERE size_after IS NOT NULL
+            ORDER BY id DESC LIMIT 1
+        """)
+        row = cursor.fetchone()
+        if row:
+            before, after = row[0] / (1024 * 1024), row[1] / (1024 * 1024)
+            print(f"  Before compaction: {before:.2f} MB, after: {after:.2f} MB "
+                  f"({(1 - after / before):.0%} smaller)")
+
     conn.close()
 
     print("\n✓ Verification complete!")
 
+BENCH_STUDENT_COLUMNS = ("student_id as studentId, first_name as firstName, last_name as lastName, "
+                         "grade, gender, ethnicity, address, zip_code as zipCode")
+
+# Read shapes issued by server_v2.py: (name, sql, params(rng, sample))
+BENCH_QUERIES = [
+    ('schools', """
+        SELECT s.id, s.name, COALESCE(c.student_count, 0) as studentCount
+        FROM schools s LEFT JOIN school_student_counts c ON s.id = c.school_id
+        ORDER BY s.name
+     """, lambda rng, sample: []),
+    ('roster', f"""
+        SELECT {BENCH_STUDENT_COLUMNS} FROM students WHERE school_id = ?
+        ORDER BY last_name, first_name LIMIT ? OFFSET ?
+     """, lambda rng, sample: [rng.choice(sample['schools']), 51, rng.choice([0, 0, 50, 100])]),
+    ('roster_count', """
+        SELECT COUNT(*) FROM students WHERE school_id = ?
+     """, lambda rng, sample: [rng.choice(sample['schools'])]),
+    ('roster_filtered', f"""
+        SELECT {BENCH_STUDENT_COLUMNS} FROM students WHERE school_id = ? AND grade = ?
+        ORDER BY last_name, first_name LIMIT ? OFFSET ?
+     """, lambda rng, sample: [rng.choice(sample['schools']), rng.choice(sample['grades']), 51, 0]),
+    ('student', """
+        SELECT s.student_id as studentId, s.first_name as firstName, s.last_name as lastName,
+               s.grade, s.gender, s.ethnicity, s.address, s.zip_code as zipCode, sc.name as school
+        FROM students s JOIN schools sc ON s.school_id = sc.id
+        WHERE s.student_id = ?
+     """, lambda rng, sample: [rng.choice(sample['students'])]),
+    ('search', """
+        SELECT s.student_id as studentId, s.first_name as firstName, s.last_name as lastName,
+               s.grade, sc.name as school
+        FROM students s JOIN schools sc ON s.school_id = sc.id
+        WHERE (s.first_name LIKE ? OR s.last_name LIKE ? OR s.student_id LIKE ?)
+        ORDER BY s.last_name, s.first_name LIMIT ? OFFSET ?
+     """, lambda rng, sample: [f"%{term}%" for term in [rng.choice(['an', 'er', 'li', 'ma'])] * 3] + [51, 0]),
+    ('overview', f"""
+        SELECT * FROM (
+            SELECT school_id, {BENCH_STUDENT_COLUMNS},
+                   ROW_NUMBER() OVER (PARTITION BY school_id ORDER BY last_name, first_name) as position
+            FROM students WHERE school_id IN (SELECT value FROM json_each(?))
+        ) WHERE position <= ?
+     """, lambda rng, sample: [json.dumps(rng.sample(sample['schools'], min(5, len(sample['schools'])))), 50]),
+]
+
+BENCH_BUSY_RETRY_DELAY = 0.001  # Seconds between retries after SQLITE_BUSY
+
+def is_busy(error):
+    message = str(error)
+    return 'locked' in message or 'busy' in message
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def bench_sample():
+    """Pick the schools, students and grades the benchmark queries draw from."""
+    conn = sqlite3.connect(DB_PATH)
+    sample = {
+        'schools': [row[0] for row in conn.execute("SELECT id FROM schools")],
+        'students': [row[0] for row in conn.execute(
+            "SELECT student_id FROM students ORDER BY random() LIMIT 1000")],
+        'grades': [row[0] for row in conn.execute("SELECT DISTINCT grade FROM students")],
+    }
+    conn.close()
+    return sample
+
+def bench_reader(db_path, duration, seed, sample):
+    """
+    Run random API read shapes for duration seconds, streaming every result.
+
+    The connection has no busy timeout, so every SQLITE_BUSY is seen and
+    counted before retrying.
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path, timeout=0)
+    latencies = {name: [] for name, _, _ in BENCH_QUERIES}
+    busy = 0
+    rows = 0
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        name, sql, params = rng.choice(BENCH_QUERIES)
+        args = params(rng, sample)
+
+        start = time.perf_counter()
+        while True:
+            try:
+                for _ in conn.execute(sql, args):
+                    rows += 1
+                break
+            except sqlite3.OperationalError as e:
+                if not is_busy(e):
+                    raise
+                busy += 1
+                time.sleep(BENCH_BUSY_RETRY_DELAY)
+        latencies[name].append((time.perf_counter() - start) * 1000)
+
+    conn.close()
+    return {'latencies': latencies, 'busy': busy, 'rows': rows}
+
+def bench_writer(db_path, duration, seed, sample, batch_size, pause):
+    """
+    Apply delta imports for duration seconds.
+
+    Each batch re-imports randomly chosen students unchanged through
+    apply_student_delta() and bumps the data version, so updated_at and
+    data_version change. run_benchmark() points it at a copy of the database.
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path, timeout=0, isolation_level=None)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM schools")
+    school_id_map = {name: id for id, name in cursor.fetchall()}
+
+    latencies = []
+    busy = 0
+    rows = 0
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        ids = rng.sample(sample['students'], min(batch_size, len(sample['students'])))
+        cursor.execute("""
+            SELECT s.student_id as studentId, s.first_name as firstName, s.last_name as lastName,
+                   s.grade, s.gender, s.ethnicity, s.address, s.zip_code as zipCode, sc.name as school
+            FROM students s JOIN schools sc ON s.school_id = sc.id
+            WHERE s.student_id IN (SELECT value FROM json_each(?))
+        """, [json.dumps(ids)])
+        columns = [column[0] for column in cursor.description]
+        students = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        start = time.perf_counter()
+        while True:
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                apply_student_delta(cursor, students, school_id_map)
+                bump_data_version(cursor)
+                cursor.execute("COMMIT")
+                break
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                if not is_busy(e):
+                    raise
+                busy += 1
+                time.sleep(BENCH_BUSY_RETRY_DELAY)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rows += len(students)
+
+        time.sleep(pause)
+
+    conn.close()
+    return {'latencies': latencies, 'busy': busy, 'rows': rows}
+
+def summarize_latencies(latencies):
+    values = sorted(round(ms, 3) for ms in latencies)
+    return {
+        'count': len(values),
+        'p50_ms': percentile(values, 50),
+        'p95_ms': percentile(values, 95),
+        'p99_ms': percentile(values, 99),
+        'max_ms': values[-1] if values else None,
+    }
+
+def run_benchmark(readers=4, duration=10, processes=False, writer=False,
+                  writer_batch=500, writer_pause=0.5, json_path=None):
+    """
+    Concurrency benchmark: readers run the API's query shapes while an
+    optional writer applies delta imports. Reports throughput, SQLITE_BUSY
+    counts and latency percentiles, optionally as JSON.
+    """
+    kind = 'processes' if processes else 'threads'
+    print(f"\nBenchmarking {readers} reader {kind} for {duration}s"
+          f"{' with a delta-import writer' if writer else ''}...")
+
+    sample = bench_sample()
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+
+    # The writer touches updated_at and bumps data_version, which would make a
+    # running API rebuild its caches; readers and writer share a scratch copy
+    scratch = None
+    db_path = DB_PATH
+    if writer:
+        scratch = tempfile.TemporaryDirectory(dir=Path(DB_PATH).parent, prefix='bench-')
+        db_path = str(Path(scratch.name) / Path(DB_PATH).name)
+        source, copy = sqlite3.connect(DB_PATH), sqlite3.connect(db_path)
+        source.backup(copy)
+        copy.execute("PRAGMA journal_mode=WAL")
+        copy.close()
+        source.close()
+        print(f"  Running against a copy at {db_path}; {DB_PATH} is not modified")
+
+    try:
+        start = time.perf_counter()
+        with executor(max_workers=readers + (1 if writer else 0)) as pool:
+            reader_futures = [pool.submit(bench_reader, db_path, duration, seed, sample)
+                              for seed in range(readers)]
+            writer_future = (pool.submit(bench_writer, db_path, duration, readers, sample,
+                                         writer_batch, writer_pause) if writer else None)
+            reader_results = [future.result() for future in reader_futures]
+            writer_result = writer_future.result() if writer_future else None
+        elapsed = time.perf_counter() - start
+    finally:
+        if scratch:
+            scratch.cleanup()
+
+    all_latencies = []
+    shapes = {}
+    for name, _, _ in BENCH_QUERIES:
+        latencies = [ms for result in reader_results for ms in result['latencies'][name]]
+        all_latencies.extend(latencies)
+        shapes[name] = summarize_latencies(latencies)
+
+    report = {
+        'database': DB_PATH,
+        'readers': readers,
+        'mode': kind,
+        'duration_s': round(elapsed, 3),
+        'reads': {
+            **summarize_latencies(all_latencies),
+            'queries_per_s': round(len(all_latencies) / elapsed, 1),
+            'rows': sum(result['rows'] for result in reader_results),
+            'busy': sum(result['busy'] for result in reader_results),
+        },
+        'shapes': shapes,
+        'writer': None,
+    }
+    if writer_result:
+        report['writer'] = {
+            **summarize_latencies(writer_result['latencies']),
+            'rows': writer_result['rows'],
+            'rows_per_s': round(writer_result['rows'] / elapsed, 1),
+            'busy': writer_result['busy'],
+        }
+
+    def fmt(ms):
+        return f"{ms:8.2f}" if ms is not None else "       -"
+
+    reads = report['reads']
+    print(f"\n✓ {reads['count']:,} queries in {elapsed:.1f}s ({reads['queries_per_s']:,.0f}/s), "
+          f"{reads['rows']:,} rows streamed, {reads['busy']:,} SQLITE_BUSY")
+    print(f"\n  {'shape':<16}{'count':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, stats in [*shapes.items(), ('all', reads)]:
+        print(f"  {name:<16}{stats['count']:>8,} {fmt(stats['p50_ms'])} {fmt(stats['p95_ms'])} "
+              f"{fmt(stats['p99_ms'])} {fmt(stats['max_ms'])}")
+
+    if report['writer']:
+        w = report['writer']
+        print(f"\n✓ Writer: {w['count']:,} delta imports, {w['rows']:,} students "
+              f"({w['rows_per_s']:,.0f}/s), {w['busy']:,} SQLITE_BUSY, "
+              f"p50 {fmt(w['p50_ms']).strip()}ms, p95 {fmt(w['p95_ms']).strip()}ms")
+
+    if json_path == '-':
+        print(json.dumps(report, indent=2))
+    elif json_path:
+        Path(json_path).write_text(json.dumps(report, indent=2) + '\n')
+        print(f"\n✓ Benchmark results written to {json_path}")
+
+    return report
+
 def main():
     parser = argparse.ArgumentParser(
         description="Database migration tool for Aspen-Lite",
@@ -258,6 +1523,24 @@ Examples:
   # Verify after import
   python3 migrate_data.py --verify
 
+  # Apply changed students from a nightly extract
+  python3 migrate_data.py --import-delta data/changed_students.json
+
+  # Benchmark 8 reader processes against a delta-import writer, JSON results
+  python3 migrate_data.py --verify --readers 8 --processes --writer --json bench.json
+
+  # Rebuild the analytics snapshot without re-importing
+  python3 migrate_data.py --snapshot
+
+  # Move encounters out of the Next.js JSON file
+  python3 migrate_data.py --init --import-encounters data/encounters.json
+
+  # Backfill encounter statistics and the demographic cube after bulk changes
+  python3 migrate_data.py --rebuild-stats
+
+  # Switch to compact storage (API responses are unchanged)
+  python3 migrate_data.py --compact --verify
+
   # Full workflow
   python3 migrate_data.py --init --import data/generated_students.json --verify
         """
@@ -282,22 +1565,133 @@ Examples:
         help='Verify database integrity and test performance'
     )
 
+    parser.add_argument(
+        '--import-delta',
+        dest='delta_file',
+        type=str,
+        help='Apply changed students from a JSON file (same format as --import; "deleted": true removes)'
+    )
+
+    parser.add_argument(
+        '--readers',
+        type=int,
+        default=4,
+        help='Concurrent readers for the --verify benchmark (default: 4, 0 to skip)'
+    )
+
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=10,
+        help='Seconds the --verify benchmark runs (default: 10)'
+    )
+
+    parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='Run benchmark readers as processes instead of threads'
+    )
+
+    parser.add_argument(
+        '--writer',
+        action='store_true',
+        help='Apply delta imports during the --verify benchmark'
+    )
+
+    parser.add_argument(
+        '--json',
+        dest='json_path',
+        type=str,
+        help='Write benchmark results as JSON to this file ("-" for stdout)'
+    )
+
+    parser.add_argument(
+        '--import-encounters',
+        dest='encounters_file',
+        type=str,
+        help='Import encounters from the legacy JSON store (e.g. data/encounters.json)'
+    )
+
+    parser.add_argument(
+        '--rebuild-stats',
+        action='store_true',
+        help='Rebuild encounter statistics rollups and the demographic cube '
+             '(each runs automatically after its import)'
+    )
+
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Convert student storage to the compact dictionary-encoded layout'
+    )
+
+    parser.add_argument(
+        '--snapshot',
+        action='store_true',
+        help='Rebuild the columnar analytics snapshot (runs automatically after --import)'
+    )
+
     args = parser.parse_args()
 
     # Need at least one action
-    if not (args.init or args.import_file or args.verify):
-        parser.error("At least one action required: --init, --import, or --verify")
+    if not (args.init or args.import_file or args.delta_file or args.verify or args.snapshot
+            or args.compact or args.encounters_file or args.rebuild_stats):
+        parser.error("At least one action required: --init, --import, --import-delta, "
+                     "--import-encounters, --rebuild-stats, --compact, --verify, or --snapshot")
 
     # Execute actions in order
     if args.init:
         init_database()
 
+    if args.compact:
+        if not Path(DB_PATH).exists():
+            print(f"Error: Database not found at {DB_PATH}")
+            print("Run with --init first")
+            return 1
+
+        compact_database()
+
     if args.import_file:
         if not Path(args.import_file).exists():
             print(f"Error: File not found: {args.import_file}")
             return 1
 
-        import_json_data(args.import_file)
+        if not import_json_data(args.import_file):
+            return 1
+
+    if args.delta_file:
+        if not Path(args.delta_file).exists():
+            print(f"Error: File not found: {args.delta_file}")
+            return 1
+
+        if not import_delta(args.delta_file):
+            return 1
+
+    if args.encounters_file:
+        if not Path(args.encounters_file).exists():
+            print(f"Error: File not found: {args.encounters_file}")
+            return 1
+
+        import_encounters(args.encounters_file)
+
+    if args.rebuild_stats:
+        if not Path(DB_PATH).exists():
+            print(f"Error: Database not found at {DB_PATH}")
+            print("Run with --init first")
+            return 1
+
+        if not args.encounters_file:
+            rebuild_encounter_stats()
+        if not (args.import_file or args.delta_file):
+            rebuild_demographic_stats()
+
+    if args.snapshot and not (args.import_file or args.delta_file):
+        if not Path(DB_PATH).exists():
+            print(f"Error: Database not found at {DB_PATH}")
+            print("Run with --init first")
+            return 1
+
+        export_snapshot()
 
     if args.verify:
         if not Path(DB_PATH).exists():
@@ -307,6 +1701,10 @@ Examples:
 
         verify_database()
 
+        if args.readers > 0:
+            run_benchmark(args.readers, args.duration, args.processes, args.writer,
+                          json_path=args.json_path)
+
     print("\n✨ Migration complete!")
     return 0
 
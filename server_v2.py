@@ -9,25 +9,185 @@ Usage:
 Server will start on http://localhost:8001
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 import sqlite3
 import os
+import csv
+import io
+import atexit
+import hashlib
+import json
+import mmap
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlencode
 from functools import wraps
+from itertools import chain
 from pathlib import Path
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Analytics endpoints are optional
+    pa = None
+
 app = Flask(__name__, static_folder='.')
 CORS(app)  # Enable CORS for development
 
 DB_PATH = 'data/aspen.db'
 PORT = 8001
+DATA_VERSION_CHECK_INTERVAL = 5  # Seconds between data_version lookups
+EXPORT_BATCH_SIZE = 1000  # Rows fetched from the cursor per export chunk
+SNAPSHOT_PATH = 'data/snapshots/students.arrow'  # Written by migrate_data.py
+CACHE_HIT_FLUSH_INTERVAL = 5  # Seconds between batched integration_cache hit_count writes
+CACHE_SWEEP_INTERVAL = 60  # Seconds between sweeps of expired integration_cache rows
+CACHE_MAX_STALE = 3600  # Longest an expired row is kept for stale-while-revalidate
+METRICS_FLUSH_INTERVAL = 10  # Seconds between integration metric bucket flushes
+METRICS_COMPACT_INTERVAL = 3600  # Seconds between metric rollup/retention passes
+AUDIT_MAX_PENDING = 50000  # Audit rows held in memory before requests wait for the writer
+AUDIT_BATCH_SIZE = 1000  # Audit rows per INSERT batch
+AUDIT_FLUSH_INTERVAL = 1  # Seconds the writer waits for a full batch before writing anyway
+AUDIT_ENQUEUE_TIMEOUT = 0.05  # Longest a request waits for queue space before its rows are spilled
+AUDIT_MAX_RETRIES = 5  # Consecutive failed writes before queued audit rows are spilled to disk
+AUDIT_SPILL_PATH = 'data/ferpa_audit_spill.ndjson'  # Audit rows that couldn't be written to SQLite
+DB_POOL_SIZE = 8  # Idle connections kept open so their compiled statements are reused
+STATEMENT_CACHE_SIZE = 128  # Compiled statements cached per connection
+LIST_MAX_LIMIT = int(os.environ.get('ASPEN_LIST_MAX_LIMIT', 200))  # Largest page a list endpoint returns
+LIST_STREAM_BATCH_SIZE = 100  # Rows fetched from the cursor per streamed list chunk
+
+# ============================================================================
+# CONNECTION POOL
+# ============================================================================
+
+class StatementStats:
+    """
+    Statement compilations vs. reuses across pooled connections.
+
+    sqlite3 keeps an LRU of compiled statements per connection, keyed by SQL
+    text; each connection mirrors that LRU so a lookup can be counted as a
+    hit (reused) or a compile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.distinct = set()
+        self.executions = 0
+        self.compiles = 0
+        self.connections = 0
+
+    def note(self, conn, sql):
+        statements = conn.statements
+        with self._lock:
+            self.executions += 1
+            if sql in statements:
+                statements.move_to_end(sql)
+                return
+            self.compiles += 1
+            self.distinct.add(sql)
+            statements[sql] = True
+            if len(statements) > STATEMENT_CACHE_SIZE:
+                statements.popitem(last=False)
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+
+    def snapshot(self):
+        with self._lock:
+            hits = self.executions - self.compiles
+            return {
+                'executions': self.executions,
+                'compiles': self.compiles,
+                'hits': hits,
+                'hitRate': round(hits / self.executions, 4) if self.executions else None,
+                'distinctStatements': len(self.distinct),
+                'connectionsOpened': self.connections,
+                'idleConnections': len(_pool),
+                'statementCacheSize': STATEMENT_CACHE_SIZE,
+            }
+
+statement_stats = StatementStats()
+
+class TrackedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        statement_stats.note(self.connection, sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        statement_stats.note(self.connection, sql)
+        return super().executemany(sql, seq_of_parameters)
+
+class PooledConnection(sqlite3.Connection):
+    """Connection whose close() hands it back to the pool, statement cache intact."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements = OrderedDict()  # Mirror of sqlite3's statement LRU, for StatementStats
+        self.path = None
+        self.checked_out = False
+
+    def cursor(self, factory=TrackedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        release_db(self)
+
+_pool = []
+_pool_lock = threading.Lock()
 
 def get_db():
-    """Get database connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+    """
+    Get a database connection.
+
+    Connections come from a small pool and go back to it on close(), so
+    statements compiled for one request are reused by the next.
+    """
+    conn = None
+    with _pool_lock:
+        while _pool and conn is None:
+            conn = _pool.pop()
+            if conn.path != DB_PATH:
+                sqlite3.Connection.close(conn)
+                conn = None
+
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, factory=PooledConnection, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        conn.path = DB_PATH
+        statement_stats.connection_opened()
+
+    conn.checked_out = True
     return conn
 
+def release_db(conn):
+    """Return a connection to the pool, rolling back anything left uncommitted."""
+    if not conn.checked_out:
+        return
+    conn.checked_out = False
+
+    if conn.in_transaction:
+        conn.rollback()
+
+    with _pool_lock:
+        if len(_pool) < DB_POOL_SIZE and conn.path == DB_PATH:
+            _pool.append(conn)
+            return
+
+    sqlite3.Connection.close(conn)
+
 def cache_control(max_age=300):
     """Decorator to add cache control headers."""
     def decorator(f):
@@ -49,11 +209,1117 @@ def cache_control(max_age=300):
         return decorated_function
     return decorator
 
+# ============================================================================
+# DATA VERSION
+# ============================================================================
+
+_data_version_lock = threading.Lock()
+_data_version_state = {'version': None, 'updatedAt': None, 'checkedAt': 0.0}
+
+def read_data_version(conn):
+    """Read the (version, updated_at) row stamped by migrate_data.py on import."""
+    try:
+        row = conn.execute('SELECT version, updated_at FROM data_version WHERE id = 1').fetchone()
+    except sqlite3.OperationalError:
+        row = None  # Database predates the data_version table
+
+    if not row:
+        return 0, None
+    return row[0], row[1]
+
+def get_data_version():
+    """
+    Get the current data version.
+
+    The database is consulted at most once every DATA_VERSION_CHECK_INTERVAL
+    seconds; in between, the last value read is returned.
+    """
+    now = time.monotonic()
+    with _data_version_lock:
+        state = _data_version_state
+        if state['version'] is not None and now - state['checkedAt'] < DATA_VERSION_CHECK_INTERVAL:
+            return state['version'], state['updatedAt']
+
+    conn = get_db()
+    try:
+        version, updated_at = read_data_version(conn)
+    finally:
+        conn.close()
+
+    with _data_version_lock:
+        _data_version_state.update(version=version, updatedAt=updated_at, checkedAt=now)
+
+    return version, updated_at
+
+def get_last_modified():
+    """
+    Get the time the data was last imported, as an aware UTC datetime.
+
+    Falls back to the database file mtime when no data_version row exists.
+    """
+    _, updated_at = get_data_version()
+    if updated_at:
+        modified = datetime.strptime(updated_at, '%Y-%m-%d %H:%M:%S')
+        return modified.replace(tzinfo=timezone.utc)
+
+    modified = datetime.fromtimestamp(Path(DB_PATH).stat().st_mtime, timezone.utc)
+    return modified.replace(microsecond=0)
+
+# ============================================================================
+# SCHOOL INDEX
+# ============================================================================
+
+class SchoolIndex:
+    """
+    In-memory index of school names for typeahead search.
+
+    Schools are kept in name order (matching ORDER BY s.name), with a sorted
+    array of lowercased names for prefix lookups and a trigram map for
+    substring lookups. Built once per data version.
+    """
+
+    def __init__(self, rows, version):
+        self.version = version
+        self.schools = [dict(row) for row in rows]
+        self.keys = [school['name'].lower() for school in self.schools]
+
+        # (lowercased name, position) sorted for bisect
+        self.prefix_keys = sorted((key, pos) for pos, key in enumerate(self.keys))
+
+        self.trigrams = {}
+        for pos, key in enumerate(self.keys):
+            for i in range(len(key) - 2):
+                self.trigrams.setdefault(key[i:i + 3], set()).add(pos)
+
+    def _prefix_matches(self, query):
+        matches = []
+        i = bisect_left(self.prefix_keys, (query, -1))
+        while i < len(self.prefix_keys) and self.prefix_keys[i][0].startswith(query):
+            matches.append(self.prefix_keys[i][1])
+            i += 1
+        return matches
+
+    def _substring_candidates(self, query):
+        if len(query) < 3:
+            return range(len(self.keys))
+
+        postings = [self.trigrams.get(query[i:i + 3]) for i in range(len(query) - 2)]
+        if not all(postings):
+            return []
+
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def search(self, query):
+        """Return matching schools, prefix matches first, each group in name order."""
+        query = query.lower()
+        if not query:
+            return self.schools
+
+        prefix = self._prefix_matches(query)
+        seen = set(prefix)
+        substring = [
+            pos for pos in self._substring_candidates(query)
+            if pos not in seen and query in self.keys[pos]
+        ]
+
+        return [self.schools[pos] for pos in sorted(prefix)] + \
+               [self.schools[pos] for pos in sorted(substring)]
+
+_school_index = None
+_school_index_lock = threading.Lock()
+
+def get_school_index():
+    """Get the school index, rebuilding it if the data version has changed."""
+    global _school_index
+
+    version, _ = get_data_version()
+    index = _school_index
+    if index is not None and index.version == version:
+        return index
+
+    with _school_index_lock:
+        if _school_index is None or _school_index.version != version:
+            conn = get_db()
+            rows = conn.execute('''
+                SELECT s.id, s.name, COALESCE(c.student_count, 0) as studentCount
+                FROM schools s
+                LEFT JOIN school_student_counts c ON s.id = c.school_id
+                ORDER BY s.name
+            ''').fetchall()
+            conn.close()
+
+            _school_index = SchoolIndex(rows, version)
+
+        return _school_index
+
+# ============================================================================
+# FILTER FACETS
+# ============================================================================
+
+class FilterFacets:
+    """
+    Distinct grades, genders and ethnicities for every school.
+
+    Built with one query per dimension across all schools, once per data
+    version, so /api/schools/:id/filters is a dictionary lookup.
+    """
+
+    DIMENSIONS = (('grade', 'grades'), ('gender', 'genders'), ('ethnicity', 'ethnicities'))
+
+    def __init__(self, conn, version):
+        self.version = version
+        self.by_school = {}
+
+        for column, key in FilterFacets.DIMENSIONS:
+            rows = conn.execute(f'''
+                SELECT DISTINCT school_id, {column} FROM students ORDER BY school_id, {column}
+            ''')
+            for school_id, value in rows:
+                facets = self.by_school.setdefault(school_id, {key: [] for _, key in FilterFacets.DIMENSIONS})
+                facets[key].append(value)
+
+    def get(self, school_id):
+        """Filter options for a school (empty lists for unknown schools)."""
+        facets = self.by_school.get(school_id)
+        if facets is None:
+            return {key: [] for _, key in FilterFacets.DIMENSIONS}
+        return {key: list(values) for key, values in facets.items()}
+
+_filter_facets = None
+_filter_facets_lock = threading.Lock()
+
+def get_filter_facets():
+    """Get the filter facets, rebuilding them if the data version has changed."""
+    global _filter_facets
+
+    version, _ = get_data_version()
+    facets = _filter_facets
+    if facets is not None and facets.version == version:
+        return facets
+
+    with _filter_facets_lock:
+        if _filter_facets is None or _filter_facets.version != version:
+            conn = get_db()
+            try:
+                _filter_facets = FilterFacets(conn, version)
+            finally:
+                conn.close()
+
+        return _filter_facets
+
+# ============================================================================
+# ANALYTICS SNAPSHOT
+# ============================================================================
+
+_snapshot = {'table': None, 'mtime': None}
+_snapshot_lock = threading.Lock()
+
+def get_demographics_snapshot():
+    """
+    Get the memory-mapped Arrow snapshot of student demographics.
+
+    Returns None if the snapshot file does not exist. The file is re-mapped
+    whenever migrate_data.py replaces it.
+    """
+    try:
+        mtime = os.stat(SNAPSHOT_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _snapshot_lock:
+        if _snapshot['mtime'] != mtime:
+            source = pa.memory_map(SNAPSHOT_PATH, 'r')
+            _snapshot['table'] = pa.ipc.open_file(source).read_all()
+            _snapshot['mtime'] = mtime
+        return _snapshot['table']
+
+# ============================================================================
+# SINGLE-FLIGHT
+# ============================================================================
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result."""
+
+    class Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn):
+        """
+        Call fn() unless a call for key is already running, then wait for that one.
+
+        Returns (result, shared), where shared is True if another caller ran fn.
+        Exceptions from fn are raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = SingleFlight.Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+# ============================================================================
+# INTEGRATION CACHE
+# ============================================================================
+
+def sqlite_timestamp(moment):
+    """Format a naive UTC datetime like SQLite's CURRENT_TIMESTAMP."""
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+def utc_now():
+    """Current UTC time as a naive datetime, for comparison with SQLite timestamps."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def utc_now_iso():
+    """Current UTC time in the same format as JavaScript's toISOString()."""
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+class IntegrationCache:
+    """
+    Read-through cache for external system lookups, stored in integration_cache.
+
+    - Fresh rows are served directly; misses call the upstream fetch function
+      once per key no matter how many requests miss at the same time.
+    - With stale_ttl, rows up to that many seconds past expiry are served
+      immediately while a background refresh fetches a new copy.
+    - hit_count/last_accessed are accumulated in memory and written in one
+      batch every CACHE_HIT_FLUSH_INTERVAL seconds.
+    - A background sweeper deletes rows invalidated or expired for longer
+      than CACHE_MAX_STALE.
+    """
+
+    def __init__(self):
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._hits = {}  # cache_key -> [count, last_accessed]
+        self._thread = None
+        self._stop = threading.Event()
+        self.stats = {'hits': 0, 'staleHits': 0, 'misses': 0, 'coalesced': 0,
+                      'refreshes': 0, 'upstreamErrors': 0, 'swept': 0}
+
+    def get(self, source, resource_type, resource_id, fetch, ttl, stale_ttl=0):
+        """Return cached data for the resource, fetching it with fetch(resource_id) if needed."""
+        self.start()
+        key = f'{source}:{resource_type}:{resource_id}'
+        now = utc_now()
+
+        conn = get_db()
+        row = conn.execute(
+            'SELECT data, expires_at, is_stale FROM integration_cache WHERE cache_key = ?', [key]
+        ).fetchone()
+        conn.close()
+
+        if row and not row['is_stale']:
+            expires_at = datetime.strptime(row['expires_at'], '%Y-%m-%d %H:%M:%S')
+            stale_limit = expires_at + timedelta(seconds=min(stale_ttl, CACHE_MAX_STALE))
+
+            if now < expires_at:
+                self._record_hit(key, now, 'hits')
+                integration_metrics.record(source, 'cache_hit_count')
+                return json.loads(row['data'])
+
+            if now < stale_limit:
+                self._record_hit(key, now, 'staleHits')
+                integration_metrics.record(source, 'cache_hit_count')
+                self._refresh(key, source, resource_type, resource_id, fetch, ttl)
+                return json.loads(row['data'])
+
+        with self._lock:
+            self.stats['misses'] += 1
+        integration_metrics.record(source, 'cache_miss_count')
+
+        data, shared = self.flights.do(
+            key, lambda: self._fetch_and_store(key, source, resource_type, resource_id, fetch, ttl)
+        )
+        if shared:
+            with self._lock:
+                self.stats['coalesced'] += 1
+        return data
+
+    def invalidate(self, source, resource_type, resource_id):
+        """Mark a cached resource stale so the next read fetches it again."""
+        conn = get_db()
+        with conn:
+            conn.execute('UPDATE integration_cache SET is_stale = 1 WHERE cache_key = ?',
+                         [f'{source}:{resource_type}:{resource_id}'])
+        conn.close()
+
+    def _fetch_and_store(self, key, source, resource_type, resource_id, fetch, ttl):
+        start = time.perf_counter()
+        try:
+            data = fetch(resource_id)
+        except Exception as e:
+            with self._lock:
+                self.stats['upstreamErrors'] += 1
+            integration_metrics.record(source, 'timeout_count' if isinstance(e, TimeoutError) else 'error_count')
+            raise
+        finally:
+            integration_metrics.record(source, 'request_count')
+            integration_metrics.record(source, 'response_time_ms', (time.perf_counter() - start) * 1000)
+
+        payload = json.dumps(data)
+        now = utc_now()
+
+        conn = get_db()
+        with conn:
+            conn.execute('''
+                INSERT INTO integration_cache
+                (cache_key, data, data_hash, source, resource_type, resource_id, cached_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    data = excluded.data,
+                    data_hash = excluded.data_hash,
+                    cached_at = excluded.cached_at,
+                    expires_at = excluded.expires_at,
+                    is_stale = 0
+            ''', [key, payload, hashlib.sha256(payload.encode()).hexdigest(), source,
+                  resource_type, resource_id, sqlite_timestamp(now),
+                  sqlite_timestamp(now + timedelta(seconds=ttl))])
+        conn.close()
+
+        return data
+
+    def _refresh(self, key, source, resource_type, resource_id, fetch, ttl):
+        """Fetch a fresh copy in the background unless one is already on its way."""
+        if self.flights.in_flight(key):
+            return
+
+        def run():
+            try:
+                self.flights.do(
+                    key, lambda: self._fetch_and_store(key, source, resource_type, resource_id, fetch, ttl)
+                )
+            except Exception:
+                pass  # Keep serving the stale copy; the next read retries
+
+        with self._lock:
+            self.stats['refreshes'] += 1
+        threading.Thread(target=run, daemon=True).start()
+
+    def _record_hit(self, key, now, stat):
+        with self._lock:
+            self.stats[stat] += 1
+            entry = self._hits.setdefault(key, [0, None])
+            entry[0] += 1
+            entry[1] = sqlite_timestamp(now)
+
+    def flush_hits(self):
+        """Write accumulated hit counts in a single transaction."""
+        with self._lock:
+            hits, self._hits = self._hits, {}
+
+        if not hits:
+            return
+
+        conn = get_db()
+        with conn:
+            conn.executemany('''
+                UPDATE integration_cache
+                SET hit_count = hit_count + ?, last_accessed = ?
+                WHERE cache_key = ?
+            ''', [(count, last_accessed, key) for key, (count, last_accessed) in hits.items()])
+        conn.close()
+
+    def sweep(self):
+        """Delete invalidated rows and rows expired longer than CACHE_MAX_STALE."""
+        cutoff = sqlite_timestamp(utc_now() - timedelta(seconds=CACHE_MAX_STALE))
+
+        conn = get_db()
+        with conn:
+            deleted = conn.execute(
+                'DELETE FROM integration_cache WHERE is_stale = 1 OR expires_at < ?', [cutoff]
+            ).rowcount
+        conn.close()
+
+        with self._lock:
+            self.stats['swept'] += deleted
+
+    def start(self):
+        """Start the background hit flusher and sweeper (once)."""
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='integration-cache', daemon=True)
+            self._thread.start()
+
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the background thread and flush pending hit counts."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush_hits()
+
+    def _run(self):
+        last_sweep = time.monotonic()
+        while not self._stop.wait(CACHE_HIT_FLUSH_INTERVAL):
+            try:
+                self.flush_hits()
+                if time.monotonic() - last_sweep >= CACHE_SWEEP_INTERVAL:
+                    self.sweep()
+                    last_sweep = time.monotonic()
+            except sqlite3.Error as e:
+                print(f"⚠ Integration cache maintenance failed: {e}")
+
+integration_cache = IntegrationCache()
+
+# (source, resource_type) -> {'fetch': callable(resource_id), 'ttl': seconds, 'staleTtl': seconds}
+UPSTREAMS = {}
+
+def register_upstream(source, resource_type, fetch, ttl=1800, stale_ttl=0):
+    """Register the function that fetches a resource from an external system."""
+    UPSTREAMS[(source, resource_type)] = {'fetch': fetch, 'ttl': ttl, 'staleTtl': stale_ttl}
+
+def stub_upstream(source, resource_type, delay=0.5):
+    """Slow fake upstream for local development and testing."""
+    def fetch(resource_id):
+        time.sleep(delay)
+        return {
+            'source': source,
+            'resourceType': resource_type,
+            'resourceId': resource_id,
+            'fetchedAt': utc_now_iso(),
+        }
+    return fetch
+
+# Set ASPEN_STUB_UPSTREAMS=1 to serve integration routes from stub upstreams
+if os.environ.get('ASPEN_STUB_UPSTREAMS'):
+    register_upstream('icare', 'immunizations', stub_upstream('icare', 'immunizations'), ttl=1800, stale_ttl=300)
+    register_upstream('ssm', 'iep', stub_upstream('ssm', 'iep'), ttl=600, stale_ttl=300)
+    register_upstream('ssm', '504', stub_upstream('ssm', '504'), ttl=600, stale_ttl=300)
+
+# ============================================================================
+# INTEGRATION METRICS
+# ============================================================================
+
+# Bucket width (seconds) -> strftime format that floors a timestamp to it
+METRIC_RESOLUTIONS = {60: '%Y-%m-%d %H:%M:00', 3600: '%Y-%m-%d %H:00:00', 86400: '%Y-%m-%d 00:00:00'}
+
+# Bucket width -> (days kept at this width, width it is rolled up into)
+METRIC_RETENTION = {60: (2, 3600), 3600: (30, 86400), 86400: (365, None)}
+
+class IntegrationMetrics:
+    """
+    Time-bucketed counters and latencies for integrations, in integration_metrics.
+
+    record() only updates an in-memory one-minute bucket (count, total, min,
+    max); buckets are merged into the table every METRICS_FLUSH_INTERVAL
+    seconds. As buckets age past METRIC_RETENTION they are rolled up
+    minute -> hour -> day, and daily buckets past retention are deleted, so
+    the table stays small however many events are recorded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}  # (integration, metric, bucket_start) -> [count, total, min, max]
+        self._flush_lock = threading.Lock()  # Held while buckets move from memory to the table
+        self._thread = None
+        self._stop = threading.Event()
+
+    def record(self, integration, metric, value=1):
+        """Add one event (a counter increment or a latency sample) to the current bucket."""
+        self.start()
+        bucket_start = utc_now().strftime(METRIC_RESOLUTIONS[60])
+        key = (integration, metric, bucket_start)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = [1, value, value, value]
+            else:
+                bucket[0] += 1
+                bucket[1] += value
+                bucket[2] = min(bucket[2], value)
+                bucket[3] = max(bucket[3], value)
+
+    def flush(self):
+        """Merge in-memory buckets into integration_metrics."""
+        with self._flush_lock:
+            with self._lock:
+                buckets, self._buckets = self._buckets, {}
+
+            if not buckets:
+                return
+
+            conn = get_db()
+            with conn:
+                conn.executemany('''
+                    INSERT INTO integration_metrics
+                    (integration_name, metric_name, window_seconds, bucket_start, count, total, min, max)
+                    VALUES (?, ?, 60, ?, ?, ?, ?, ?)
+                    ON CONFLICT(integration_name, metric_name, window_seconds, bucket_start) DO UPDATE SET
+                        count = count + excluded.count,
+                        total = total + excluded.total,
+                        min = MIN(min, excluded.min),
+                        max = MAX(max, excluded.max)
+                ''', [key + tuple(bucket) for key, bucket in buckets.items()])
+            conn.close()
+
+    def compact(self):
+        """Roll aged buckets up to the next resolution and delete expired ones."""
+        now = utc_now()
+
+        conn = get_db()
+        with conn:
+            for window, (days, rollup) in METRIC_RETENTION.items():
+                # Whole target buckets only, so a bucket is never rolled up twice
+                cutoff = now - timedelta(days=days)
+                if rollup:
+                    cutoff = cutoff.strftime(METRIC_RESOLUTIONS[rollup])
+                    conn.execute(f'''
+                        INSERT INTO integration_metrics
+                        (integration_name, metric_name, window_seconds, bucket_start, count, total, min, max)
+                        SELECT integration_name, metric_name, ?,
+                               strftime('{METRIC_RESOLUTIONS[rollup]}', bucket_start),
+                               SUM(count), SUM(total), MIN(min), MAX(max)
+                        FROM integration_metrics
+                        WHERE window_seconds = ? AND bucket_start < ?
+                        GROUP BY 1, 2, 4
+                        ON CONFLICT(integration_name, metric_name, window_seconds, bucket_start) DO UPDATE SET
+                            count = count + excluded.count,
+                            total = total + excluded.total,
+                            min = MIN(min, excluded.min),
+                            max = MAX(max, excluded.max)
+                    ''', [rollup, window, cutoff])
+                else:
+                    cutoff = sqlite_timestamp(cutoff)
+
+                conn.execute('DELETE FROM integration_metrics WHERE window_seconds = ? AND bucket_start < ?',
+                             [window, cutoff])
+        conn.close()
+
+    def query(self, integration, metrics, start, end, resolution):
+        """
+        Return buckets of the given width covering [start, end).
+
+        Reads rows of every width no wider than resolution in the window
+        (recent data is still per-minute, older data already rolled up) and
+        merges them into resolution-wide buckets, along with the minute
+        buckets recorded since the last flush.
+        """
+        windows = [window for window in METRIC_RESOLUTIONS if window <= resolution]
+        start, end = sqlite_timestamp(start), sqlite_timestamp(end)
+
+        # Hold off flushes so no bucket is missed, or counted twice, mid-move
+        with self._flush_lock:
+            with self._lock:
+                unflushed = [(metric, bucket_start, list(bucket))
+                             for (name, metric, bucket_start), bucket in self._buckets.items()
+                             if name == integration and metric in metrics and start <= bucket_start < end]
+
+            conn = get_db()
+            rows = conn.execute(f'''
+                SELECT metric_name as metric,
+                       strftime('{METRIC_RESOLUTIONS[resolution]}', bucket_start) as bucket,
+                       SUM(count) as count, SUM(total) as total, MIN(min) as min, MAX(max) as max
+                FROM integration_metrics
+                WHERE integration_name = ?
+                  AND metric_name IN (SELECT value FROM json_each(?))
+                  AND window_seconds IN (SELECT value FROM json_each(?))
+                  AND bucket_start >= ? AND bucket_start < ?
+                GROUP BY metric_name, bucket
+            ''', [integration, json.dumps(metrics), json.dumps(windows), start, end]).fetchall()
+            conn.close()
+
+        merged = {(row['metric'], row['bucket']): [row['count'], row['total'], row['min'], row['max']]
+                  for row in rows}
+        for metric, bucket_start, (count, total, low, high) in unflushed:
+            bucket = datetime.strptime(bucket_start, '%Y-%m-%d %H:%M:%S').strftime(METRIC_RESOLUTIONS[resolution])
+            current = merged.get((metric, bucket))
+            if current is None:
+                merged[(metric, bucket)] = [count, total, low, high]
+            else:
+                current[0] += count
+                current[1] += total
+                current[2] = min(current[2], low)
+                current[3] = max(current[3], high)
+
+        return [{'metric': metric, 'bucket': bucket, 'count': count, 'total': total, 'min': low, 'max': high}
+                for (metric, bucket), (count, total, low, high) in sorted(merged.items())]
+
+    def start(self):
+        """Start the background flusher (once)."""
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='integration-metrics', daemon=True)
+            self._thread.start()
+
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the background thread and flush the open buckets."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        last_compact = 0.0
+        while not self._stop.wait(METRICS_FLUSH_INTERVAL):
+            try:
+                self.flush()
+                if time.monotonic() - last_compact >= METRICS_COMPACT_INTERVAL:
+                    self.compact()
+                    last_compact = time.monotonic()
+            except sqlite3.Error as e:
+                print(f"⚠ Integration metrics flush failed: {e}")
+
+integration_metrics = IntegrationMetrics()
+
+# Counters record one event each; response_time_ms records a latency sample
+METRIC_NAMES = ('request_count', 'error_count', 'timeout_count', 'cache_hit_count',
+                'cache_miss_count', 'response_time_ms')
+
+# ============================================================================
+# FERPA AUDIT LOG
+# ============================================================================
+
+AUDIT_COLUMNS = ('user_id', 'user_email', 'user_role', 'student_id', 'action', 'resource_type',
+                 'ferpa_classification', 'fields_accessed', 'ip_address', 'user_agent',
+                 'session_id', 'data_source', 'timestamp')
+
+AUDIT_INSERT_SQL = f'''
+    INSERT INTO ferpa_audit_logs ({', '.join(AUDIT_COLUMNS)})
+    VALUES ({', '.join('?' * len(AUDIT_COLUMNS))})
+'''
+
+class AuditLog:
+    """
+    Asynchronous writer for ferpa_audit_logs.
+
+    Requests only append rows to an in-memory queue; a background thread
+    drains it into ferpa_audit_logs in batched transactions, so reads never
+    take the SQLite write lock themselves.
+
+    - The queue holds at most AUDIT_MAX_PENDING rows. When it is full a
+      request waits up to AUDIT_ENQUEUE_TIMEOUT for the writer, then spills
+      its rows to AUDIT_SPILL_PATH, so a stalled writer can't stall reads.
+    - A batch that fails with a row-level error is split in half until the
+      bad rows are isolated; those are spilled and the rest written.
+    - Other write failures are retried on the next pass, AUDIT_MAX_RETRIES
+      times in a row at most, after which the queue is spilled.
+    - Pending rows are written (or spilled) on shutdown.
+
+    Rows are only counted as dropped when the spill file can't be written
+    either; /api/health reports both counts.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = []
+        self._thread = None
+        self._stop = False
+        self.enabled = True  # Off only while the server warms itself up
+        self._local = threading.local()  # Calls captured for coalesced requests
+        self._failures = 0  # Consecutive failed writes
+        self._spill_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'written': 0, 'batches': 0, 'spilled': 0, 'dropped': 0,
+                      'waits': 0, 'writeErrors': 0, 'rejectedRows': 0, 'maxPending': 0,
+                      'lastBatchRows': 0, 'lastBatchMs': 0.0, 'writeSeconds': 0.0}
+
+    def record(self, student_ids, action, resource_type, fields, classification='educational',
+               data_source='local'):
+        """Queue one audit row per student for the current request."""
+        if not student_ids:
+            return
+
+        captured = getattr(self._local, 'calls', None)
+        if captured is not None:
+            captured.append((student_ids, action, resource_type, fields, classification, data_source))
+
+        if not self.enabled:
+            return
+
+        self.start()
+        context = audit_context()
+        fields_accessed = json.dumps(fields)
+        timestamp = sqlite_timestamp(utc_now())
+        rows = [(context['userId'], context['userEmail'], context['userRole'], str(student_id),
+                 action, resource_type, classification, fields_accessed, context['ipAddress'],
+                 context['userAgent'], context['sessionId'], data_source, timestamp)
+                for student_id in student_ids]
+
+        full = False
+        with self._cond:
+            if not self._has_room(len(rows)):
+                self.stats['waits'] += 1
+                self._cond.notify_all()  # Wake the writer early
+                full = not self._cond.wait_for(lambda: self._has_room(len(rows)), AUDIT_ENQUEUE_TIMEOUT)
+
+            if not full:
+                self._pending.extend(rows)
+                self.stats['enqueued'] += len(rows)
+                self.stats['maxPending'] = max(self.stats['maxPending'], len(self._pending))
+                if len(self._pending) >= AUDIT_BATCH_SIZE:
+                    self._cond.notify_all()
+
+        if full:
+            self._spill(rows, 'queue full')
+
+    @contextmanager
+    def capture(self):
+        """Collect the record() calls made on this thread, so they can be replayed for other requests."""
+        calls = []
+        self._local.calls = calls
+        try:
+            yield calls
+        finally:
+            self._local.calls = None
+
+    def _has_room(self, count):
+        # An oversized request is still accepted into an empty queue
+        return not self._pending or len(self._pending) + count <= AUDIT_MAX_PENDING
+
+    def _write(self, conn, rows, progress):
+        """
+        Insert rows in one transaction, adding them to progress['written'].
+
+        A row-level error (constraint violation, unbindable value) splits the
+        batch in half until the offending rows are isolated; those go to
+        progress['rejected']. Any other error is raised: it would fail every
+        row alike. Rows are handled in order, so the ones not yet in progress
+        are exactly the ones left to write.
+        """
+        try:
+            with conn:
+                conn.executemany(AUDIT_INSERT_SQL, rows)
+            progress['written'] += len(rows)
+        except (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError):
+            if len(rows) == 1:
+                progress['rejected'].extend(rows)
+                return
+            middle = len(rows) // 2
+            self._write(conn, rows[:middle], progress)
+            self._write(conn, rows[middle:], progress)
+
+    def _spill(self, rows, reason):
+        """Append rows that can't go to SQLite to AUDIT_SPILL_PATH, as ndjson."""
+        if not rows:
+            return
+        try:
+            with self._spill_lock, open(AUDIT_SPILL_PATH, 'a') as f:
+                f.writelines(json.dumps({**dict(zip(AUDIT_COLUMNS, row)), 'spillReason': reason}) + '\n'
+                             for row in rows)
+        except OSError as e:
+            with self._cond:
+                self.stats['dropped'] += len(rows)
+            print(f"❌ FERPA audit rows LOST: {len(rows)} rows ({reason}) could not be spilled "
+                  f"to {AUDIT_SPILL_PATH}: {e}")
+            return
+
+        with self._cond:
+            self.stats['spilled'] += len(rows)
+        print(f"⚠ {len(rows)} FERPA audit rows spilled to {AUDIT_SPILL_PATH} ({reason})")
+
+    def flush(self):
+        """Write every pending row. Returns False if the write failed."""
+        with self._cond:
+            rows, self._pending = self._pending, []
+            self._cond.notify_all()  # Space for waiting requests
+
+        if not rows:
+            return True
+
+        start = time.perf_counter()
+        progress = {'written': 0, 'rejected': []}
+        rejected = progress['rejected']
+        conn = None
+        try:
+            conn = get_db()
+            for i in range(0, len(rows), AUDIT_BATCH_SIZE):
+                self._write(conn, rows[i:i + AUDIT_BATCH_SIZE], progress)
+        except sqlite3.Error as e:
+            written = progress['written']
+            unwritten = rows[written + len(rejected):]
+            with self._cond:
+                self.stats['writeErrors'] += 1
+                self.stats['written'] += written
+                self.stats['rejectedRows'] += len(rejected)
+                self._failures += 1
+                give_up = self._failures >= AUDIT_MAX_RETRIES
+                if not give_up:
+                    # Retry ahead of newer rows, within the queue bound
+                    room = max(AUDIT_MAX_PENDING - len(self._pending), 0)
+                    self._pending[:0] = unwritten[:room]
+                    overflow = unwritten[room:]
+            print(f"⚠ FERPA audit write failed (attempt {self._failures}/{AUDIT_MAX_RETRIES}): {e}")
+            self._spill(rejected, 'rejected by database')
+            self._spill(unwritten if give_up else overflow,
+                        f'write failed {AUDIT_MAX_RETRIES} times' if give_up else 'retry queue full')
+            return False
+        finally:
+            if conn is not None:
+                conn.close()
+
+        written = progress['written']
+        elapsed = time.perf_counter() - start
+        with self._cond:
+            self._failures = 0
+            self.stats['written'] += written
+            self.stats['rejectedRows'] += len(rejected)
+            self.stats['batches'] += 1
+            self.stats['lastBatchRows'] = written
+            self.stats['lastBatchMs'] = round(elapsed * 1000, 2)
+            self.stats['writeSeconds'] += elapsed
+        self._spill(rejected, 'rejected by database')
+        return True
+
+    def start(self):
+        """Start the background writer (once)."""
+        if self._thread is not None:
+            return
+
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='ferpa-audit', daemon=True)
+            self._thread.start()
+
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the writer and write anything still queued."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        if not self.flush():
+            with self._cond:
+                rows, self._pending = self._pending, []
+            self._spill(rows, 'shutdown')
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stop or len(self._pending) >= AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL
+                )
+                if self._stop:
+                    return
+            if not self.flush():
+                time.sleep(AUDIT_FLUSH_INTERVAL)
+
+    def snapshot(self):
+        """Counters plus current queue depth and write throughput."""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._pending)
+        stats['writeSeconds'] = round(stats['writeSeconds'], 3)
+        stats['rowsPerSecond'] = (round(stats['written'] / stats['writeSeconds'])
+                                  if stats['writeSeconds'] else 0)
+        return stats
+
+audit_log = AuditLog()
+
+def audit_context():
+    """
+    Who is making the current request.
+
+    There is no login yet, so the front end identifies the user with
+    X-User-Id / X-User-Email / X-User-Role / X-Session-Id headers.
+    """
+    return {
+        'userId': request.headers.get('X-User-Id', 'anonymous'),
+        'userEmail': request.headers.get('X-User-Email'),
+        'userRole': request.headers.get('X-User-Role'),
+        'sessionId': request.headers.get('X-Session-Id'),
+        'ipAddress': request.remote_addr,
+        'userAgent': request.headers.get('User-Agent'),
+    }
+
+# ============================================================================
+# REQUEST COALESCING
+# ============================================================================
+
+# Endpoint -> whether identical concurrent GETs share one computation.
+# Routes must be decorated with @coalesce_requests for this to apply.
+COALESCE_ROUTES = {
+    'get_schools': True,
+    'get_school_students': True,
+    'get_school_filters': True,
+    'get_student': True,
+    'search_students': True,
+    'get_demographics': True,
+    'get_demographic_summary': True,
+    'list_encounters': False,  # Reads its own writes; a shared result could predate them
+    'get_encounter_stats': False,  # Same: stats must include encounters the client just saved
+}
+
+# Pages larger than this stream straight to their requester; sharing them
+# would mean buffering the whole body
+COALESCE_MAX_LIMIT = 100
+
+request_flights = SingleFlight()
+_coalesce_lock = threading.Lock()
+coalesce_stats = {}  # endpoint -> {'computed': n, 'coalesced': n}
+
+def coalesce_requests(view):
+    """
+    Decorator: concurrent identical GET requests share one run of the view.
+
+    Requests are identical when they hit the same endpoint with the same
+    path and query parameters (in any order). The first request runs the
+    view; the rest wait for it and get a copy of its serialized response.
+    Audit rows the view records are replayed for each waiting request, so
+    every requester still appears in the FERPA audit trail. Requests for
+    pages over COALESCE_MAX_LIMIT rows always run on their own.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        endpoint = request.endpoint
+        if request.method != 'GET' or not COALESCE_ROUTES.get(endpoint):
+            return view(*args, **kwargs)
+        if request.args.get('limit', 0, type=int) > COALESCE_MAX_LIMIT:
+            return view(*args, **kwargs)
+
+        key = (endpoint, request.path, urlencode(sorted(request.args.items(multi=True))))
+
+        def compute():
+            with audit_log.capture() as audit_calls:
+                response = app.make_response(view(*args, **kwargs))
+                try:
+                    body = response.get_data()  # Streamed views record audit rows as they run
+                finally:
+                    response.close()  # Runs the view's close callbacks (e.g. returning its connection)
+            return body, response.status_code, list(response.headers.items()), audit_calls
+
+        (body, status, headers, audit_calls), shared = request_flights.do(key, compute)
+
+        with _coalesce_lock:
+            counts = coalesce_stats.setdefault(endpoint, {'computed': 0, 'coalesced': 0})
+            counts['coalesced' if shared else 'computed'] += 1
+
+        if shared:
+            for call in audit_calls:
+                audit_log.record(*call)
+
+        return Response(body, status=status, headers=headers)
+
+    return decorated_function
+
+# ============================================================================
+# STREAMING LIST RESPONSES
+# ============================================================================
+
+def parse_limit(default):
+    """Read the limit query param, clamped to 0..LIST_MAX_LIMIT."""
+    return min(max(0, int(request.args.get('limit', default))), LIST_MAX_LIMIT)
+
+def cursor_batches(cursor):
+    """Yield a cursor's rows LIST_STREAM_BATCH_SIZE at a time."""
+    while True:
+        rows = cursor.fetchmany(LIST_STREAM_BATCH_SIZE)
+        if not rows:
+            return
+        yield rows
+
+compact_json = json.JSONEncoder(separators=(',', ':')).encode  # Same spacing as jsonify
+
+def json_members(members):
+    """Encode a dict's items as the comma-separated members of a JSON object."""
+    return ','.join(f'{compact_json(key)}:{compact_json(value)}' for key, value in members.items())
+
+def stream_list(key, batches, limit, head=None, tail=None, on_batch=None, on_close=None):
+    """
+    Stream a paginated list as one JSON object, encoding rows as they're read.
+
+    batches yields lists of rows (sqlite3.Row or dict) and should hold up to
+    limit + 1 rows; the extra row only sets hasMore. The object is written
+    as head's members, then key's array, then the members returned by
+    tail(count, has_more) and hasMore, so totals can be worked out after the
+    rows. on_batch sees each batch before it's sent (for audit logging) and
+    on_close runs when the response is closed, streamed or not.
+
+    The first batch is read before the response starts, so a failing query
+    still gets a normal error status. A failure after that is logged and the
+    object is closed with an error member instead of being cut short.
+
+    Returns:
+        A streamed application/json Response
+    """
+    batches = iter(batches)
+    try:
+        first = next(batches, [])
+    except Exception:
+        if on_close:
+            on_close()
+        raise
+
+    def generate():
+        count = 0
+        has_more = False
+        opening = json_members(head) + ',' if head else ''
+        yield '{' + opening + compact_json(key) + ':['
+
+        try:
+            for rows in chain([first], batches):
+                if count + len(rows) > limit:
+                    has_more = True
+                    rows = rows[:limit - count]
+                if rows:
+                    if on_batch:
+                        on_batch(rows)
+                    yield (',' if count else '') + ','.join(compact_json(dict(row)) for row in rows)
+                    count += len(rows)
+                if has_more:
+                    break
+
+            members = dict(tail(count, has_more)) if tail else {}
+            members['hasMore'] = has_more
+        except Exception as e:
+            print(f"⚠ Streaming {key} failed after {count} rows: {e}")
+            members = {'error': f'Failed to read {key}', 'hasMore': has_more}
+
+        yield '],' + json_members(members) + '}'
+
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    if on_close:
+        response.call_on_close(on_close)
+    return response
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
 
 @app.route('/api/schools')
+@coalesce_requests
 @cache_control(300)  # Cache for 5 minutes
 def get_schools():
     """
@@ -70,54 +1336,39 @@ def get_schools():
             total: int,
             hasMore: bool
         }
+
+        Search results list name-prefix matches before substring matches.
     """
     search = request.args.get('search', '').strip()
-    limit = min(int(request.args.get('limit', 100)), 200)  # Max 200
-    offset = int(request.args.get('offset', 0))
-
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Build query
-    query = '''
-        SELECT s.id, s.name, COALESCE(c.student_count, 0) as studentCount
-        FROM schools s
-        LEFT JOIN school_student_counts c ON s.id = c.school_id
-    '''
+    limit = parse_limit(100)
+    offset = max(0, int(request.args.get('offset', 0)))
 
-    params = []
+    # Served from the in-memory index; never touches SQLite
+    matches = get_school_index().search(search)
+    page = matches[offset:offset + limit + 1]
+    batches = (page[i:i + LIST_STREAM_BATCH_SIZE] for i in range(0, len(page), LIST_STREAM_BATCH_SIZE))
 
-    if search:
-        query += ' WHERE s.name LIKE ?'
-        params.append(f'%{search}%')
+    return stream_list('schools', batches, limit, tail=lambda count, has_more: {'total': len(matches)})
 
-    # Get total count
-    count_query = 'SELECT COUNT(*) FROM schools'
-    if search:
-        count_query += ' WHERE name LIKE ?'
-        cursor.execute(count_query, [f'%{search}%'] if search else [])
-    else:
-        cursor.execute(count_query)
-
-    total = cursor.fetchone()[0]
-
-    # Add pagination
-    query += ' ORDER BY s.name LIMIT ? OFFSET ?'
-    params.extend([limit + 1, offset])  # Fetch one extra to check hasMore
-
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+def read_school_ids_body():
+    """
+    Read {schoolIds: [int], ...} from the request body.
 
-    has_more = len(rows) > limit
-    schools = [dict(row) for row in rows[:limit]]
+    Returns (body, school_ids, error); error is a message for a 400 when the
+    body isn't an object or schoolIds isn't a list of integers.
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return None, None, 'Request body must be a JSON object'
 
-    conn.close()
+    school_ids = data.get('schoolIds', [])
+    if not isinstance(school_ids, list) or \
+            not all(isinstance(i, int) and not isinstance(i, bool) for i in school_ids):
+        return None, None, 'schoolIds must be a list of integers'
 
-    return {
-        'schools': schools,
-        'total': total,
-        'hasMore': has_more
-    }
+    return data, school_ids, None
 
 @app.route('/api/schools/favorites', methods=['POST'])
 @cache_control(300)
@@ -131,8 +1382,9 @@ def get_favorite_schools():
     Returns:
         { schools: [{id, name, studentCount}] }
     """
-    data = request.get_json()
-    school_ids = data.get('schoolIds', [])
+    _, school_ids, error = read_school_ids_body()
+    if error:
+        return {'error': error}, 400
 
     if not school_ids:
         return {'schools': []}
@@ -140,56 +1392,119 @@ def get_favorite_schools():
     conn = get_db()
     cursor = conn.cursor()
 
-    placeholders = ','.join('?' * len(school_ids))
-    query = f'''
+    # One statement for any number of IDs, passed as a JSON array
+    query = '''
         SELECT s.id, s.name, COALESCE(c.student_count, 0) as studentCount
         FROM schools s
         LEFT JOIN school_student_counts c ON s.id = c.school_id
-        WHERE s.id IN ({placeholders})
+        WHERE s.id IN (SELECT value FROM json_each(?))
         ORDER BY s.name
     '''
 
-    cursor.execute(query, school_ids)
+    cursor.execute(query, [json.dumps(school_ids)])
     schools = [dict(row) for row in cursor.fetchall()]
 
     conn.close()
 
     return {'schools': schools}
 
-@app.route('/api/schools/<int:school_id>/students')
-@cache_control(120)  # Cache for 2 minutes
-def get_school_students(school_id):
+OVERVIEW_MAX_SCHOOLS = 50  # Schools per /api/schools/overview request
+
+@app.route('/api/schools/overview', methods=['POST'])
+def get_schools_overview():
     """
-    Get students for a specific school with filters and pagination.
+    Get summary, filter options and the first page of students for several schools.
 
-    Query params:
-        - limit: int (default: 50) - Number of results
-        - offset: int (default: 0) - Pagination offset
-        - grade: int (optional) - Filter by grade
-        - gender: string (optional) - Filter by gender
-        - ethnicity: string (optional) - Filter by ethnicity
-        - search: string (optional) - Search by name or student ID
+    Replaces a favorites call plus /students and /filters per school. The
+    data comes from two set-based queries (summaries, and the first page of
+    every school via ROW_NUMBER()) plus the in-memory filter facets,
+    however many schools are requested.
+
+    Body:
+        { schoolIds: [int], limit: int (default: 50, max: LIST_MAX_LIMIT) }
 
     Returns:
         {
-            students: [{studentId, firstName, lastName, grade, gender, ethnicity, address, zipCode}],
-            total: int,
-            hasMore: bool,
-            school: {id, name}
+            schools: [{
+                id, name, studentCount,
+                filters: {grades, genders, ethnicities},
+                students: [{studentId, firstName, lastName, grade, gender, ethnicity, address, zipCode}],
+                total: int,
+                hasMore: bool
+            }]
         }
     """
-    limit = min(int(request.args.get('limit', 50)), 200)
-    offset = int(request.args.get('offset', 0))
+    data, school_ids, error = read_school_ids_body()
+    if error:
+        return {'error': error}, 400
 
-    grade = request.args.get('grade')
-    gender = request.args.get('gender')
-    ethnicity = request.args.get('ethnicity')
-    search = request.args.get('search', '').strip()
+    limit = data.get('limit', 50)
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 0:
+        return {'error': 'limit must be a non-negative integer'}, 400
+    limit = min(limit, LIST_MAX_LIMIT)
+
+    if not school_ids:
+        return {'schools': []}
+
+    if len(school_ids) > OVERVIEW_MAX_SCHOOLS:
+        return {'error': f'At most {OVERVIEW_MAX_SCHOOLS} schools per request'}, 400
 
+    ids_json = json.dumps(school_ids)
     conn = get_db()
-    cursor = conn.cursor()
 
-    # Build WHERE clause for both queries
+    schools = [dict(row) for row in conn.execute('''
+        SELECT s.id, s.name, COALESCE(c.student_count, 0) as studentCount
+        FROM schools s
+        LEFT JOIN school_student_counts c ON s.id = c.school_id
+        WHERE s.id IN (SELECT value FROM json_each(?))
+        ORDER BY s.name
+    ''', [ids_json])]
+
+    # First page of every school at once, in the same order as /students
+    rows = conn.execute('''
+        SELECT schoolId, studentId, firstName, lastName, grade, gender, ethnicity, address, zipCode
+        FROM (
+            SELECT school_id as schoolId, student_id as studentId, first_name as firstName,
+                   last_name as lastName, grade, gender, ethnicity, address, zip_code as zipCode,
+                   ROW_NUMBER() OVER (PARTITION BY school_id ORDER BY last_name, first_name) as position
+            FROM students
+            WHERE school_id IN (SELECT value FROM json_each(?))
+        )
+        WHERE position <= ?
+        ORDER BY schoolId, position
+    ''', [ids_json, limit]).fetchall()
+
+    conn.close()
+
+    pages = {}
+    for row in rows:
+        student = dict(row)
+        pages.setdefault(student.pop('schoolId'), []).append(student)
+
+    facets = get_filter_facets()
+    for school in schools:
+        students = pages.get(school['id'], [])
+        school['filters'] = facets.get(school['id'])
+        school['students'] = students
+        school['total'] = school['studentCount']
+        school['hasMore'] = school['studentCount'] > len(students)
+
+        audit_log.record([student['studentId'] for student in students], 'view', 'student_profile',
+                         EXPORT_COLUMNS)
+
+    return {'schools': schools}
+
+def build_student_filters(school_id, args):
+    """
+    Build the WHERE clause and params for a school roster query.
+
+    Reads the grade, gender, ethnicity and search filters from the request args.
+    """
+    grade = args.get('grade')
+    gender = args.get('gender')
+    ethnicity = args.get('ethnicity')
+    search = args.get('search', '').strip()
+
     where_conditions = ['school_id = ?']
     params = [school_id]
 
@@ -210,50 +1525,152 @@ def get_school_students(school_id):
         search_pattern = f'%{search}%'
         params.extend([search_pattern, search_pattern, search_pattern])
 
-    where_clause = 'WHERE ' + ' AND '.join(where_conditions)
+    return 'WHERE ' + ' AND '.join(where_conditions), params
+
+@app.route('/api/schools/<int:school_id>/students')
+@coalesce_requests
+@cache_control(120)  # Cache for 2 minutes
+def get_school_students(school_id):
+    """
+    Get students for a specific school with filters and pagination.
+
+    Query params:
+        - limit: int (default: 50) - Number of results
+        - offset: int (default: 0) - Pagination offset
+        - grade: int (optional) - Filter by grade
+        - gender: string (optional) - Filter by gender
+        - ethnicity: string (optional) - Filter by ethnicity
+        - search: string (optional) - Search by name or student ID
+
+    Returns:
+        {
+            students: [{studentId, firstName, lastName, grade, gender, ethnicity, address, zipCode}],
+            total: int,
+            hasMore: bool,
+            school: {id, name}
+        }
+    """
+    limit = parse_limit(50)
+    offset = max(0, int(request.args.get('offset', 0)))
+
+    # Build WHERE clause for both queries
+    where_clause, params = build_student_filters(school_id, request.args)
 
-    # Get total count with the same filters
-    count_query = f'SELECT COUNT(*) FROM students {where_clause}'
-    cursor.execute(count_query, params)
-    count_result = cursor.fetchone()
-    total = count_result[0] if count_result else 0
+    conn = get_db()
+    school_row = conn.execute('SELECT id, name FROM schools WHERE id = ?', [school_id]).fetchone()
+    if not school_row:
+        conn.close()
+        return {'error': 'School not found'}, 404
 
-    # Build main query
-    query = f'''
+    cursor = conn.execute(f'''
         SELECT student_id as studentId, first_name as firstName, last_name as lastName,
                grade, gender, ethnicity, address, zip_code as zipCode
         FROM students
         {where_clause}
         ORDER BY last_name, first_name
         LIMIT ? OFFSET ?
-    '''
-    params.extend([limit + 1, offset])
+    ''', params + [limit + 1, offset])
+
+    def total(count, has_more):
+        # A short page already tells us where the roster ends
+        if not has_more and (count or not offset):
+            return {'total': offset + count}
+        count_row = conn.execute(f'SELECT COUNT(*) FROM students {where_clause}', params).fetchone()
+        return {'total': count_row[0] if count_row else 0}
+
+    return stream_list(
+        'students', cursor_batches(cursor), limit,
+        head={'school': dict(school_row)},
+        tail=total,
+        on_batch=lambda rows: audit_log.record([row['studentId'] for row in rows], 'view',
+                                               'student_profile', EXPORT_COLUMNS),
+        on_close=conn.close,
+    )
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+EXPORT_COLUMNS = ['studentId', 'firstName', 'lastName', 'grade', 'gender', 'ethnicity', 'address', 'zipCode']
 
-    has_more = len(rows) > limit
-    students = [dict(row) for row in rows[:limit]]
+@app.route('/api/schools/<int:school_id>/students/export')
+def export_school_students(school_id):
+    """
+    Stream the full filtered roster for a school.
+
+    Query params:
+        - format: 'ndjson' (default) or 'csv'
+        - grade, gender, ethnicity, search: same filters as /api/schools/:id/students
 
-    # Get school info
-    cursor.execute('SELECT id, name FROM schools WHERE id = ?', [school_id])
-    school_row = cursor.fetchone()
+    Rows are streamed from a single cursor in EXPORT_BATCH_SIZE chunks, so
+    memory stays bounded regardless of roster size. Honors If-Modified-Since
+    against the last data import.
 
-    conn.close()
+    Returns:
+        One JSON object per line (ndjson) or a CSV file with a header row
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return {'error': 'format must be ndjson or csv'}, 400
+
+    last_modified = get_last_modified()
+    if request.if_modified_since and request.if_modified_since >= last_modified:
+        response = Response(status=304)
+        response.last_modified = last_modified
+        return response
+
+    where_clause, params = build_student_filters(school_id, request.args)
 
+    conn = get_db()
+    school_row = conn.execute('SELECT id FROM schools WHERE id = ?', [school_id]).fetchone()
     if not school_row:
+        conn.close()
         return {'error': 'School not found'}, 404
 
-    school = dict(school_row)
+    def generate():
+        try:
+            cursor = conn.execute(f'''
+                SELECT student_id as studentId, first_name as firstName, last_name as lastName,
+                       grade, gender, ethnicity, address, zip_code as zipCode
+                FROM students
+                {where_clause}
+                ORDER BY last_name, first_name
+            ''', params)
+
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_COLUMNS)
+                yield buffer.getvalue()
+
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+
+                audit_log.record([row['studentId'] for row in rows], 'export', 'student_profile',
+                                 EXPORT_COLUMNS)
+
+                if export_format == 'csv':
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(rows)
+                    yield buffer.getvalue()
+                else:
+                    yield ''.join(json.dumps(dict(row)) + '\n' for row in rows)
+        finally:
+            conn.close()
+
+    if export_format == 'csv':
+        mimetype = 'text/csv'
+        filename = f'school-{school_id}-students.csv'
+    else:
+        mimetype = 'application/x-ndjson'
+        filename = f'school-{school_id}-students.ndjson'
 
-    return {
-        'students': students,
-        'total': total,
-        'hasMore': has_more,
-        'school': school
-    }
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.last_modified = last_modified
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Cache-Control'] = 'no-cache'  # Revalidate with If-Modified-Since
+    return response
 
 @app.route('/api/students/<student_id>')
+@coalesce_requests
 @cache_control(300)  # Cache for 5 minutes
 def get_student(student_id):
     """
@@ -283,14 +1700,18 @@ def get_student(student_id):
         return {'error': 'Student not found'}, 404
 
     student = dict(row)
+    audit_log.record([student['studentId']], 'view', 'student_profile', list(student))
     return {'student': student}
 
 @app.route('/api/schools/<int:school_id>/filters')
+@coalesce_requests
 @cache_control(600)  # Cache for 10 minutes
 def get_school_filters(school_id):
     """
     Get available filter options for a school.
 
+    Served from the in-memory facets, rebuilt after each data import.
+
     Returns:
         {
             grades: [int],
@@ -298,39 +1719,10 @@ def get_school_filters(school_id):
             ethnicities: [string]
         }
     """
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Get unique grades
-    cursor.execute(
-        'SELECT DISTINCT grade FROM students WHERE school_id = ? ORDER BY grade',
-        [school_id]
-    )
-    grades = [row[0] for row in cursor.fetchall()]
-
-    # Get unique genders
-    cursor.execute(
-        'SELECT DISTINCT gender FROM students WHERE school_id = ? ORDER BY gender',
-        [school_id]
-    )
-    genders = [row[0] for row in cursor.fetchall()]
-
-    # Get unique ethnicities
-    cursor.execute(
-        'SELECT DISTINCT ethnicity FROM students WHERE school_id = ? ORDER BY ethnicity',
-        [school_id]
-    )
-    ethnicities = [row[0] for row in cursor.fetchall()]
-
-    conn.close()
-
-    return {
-        'grades': grades,
-        'genders': genders,
-        'ethnicities': ethnicities
-    }
+    return get_filter_facets().get(school_id)
 
 @app.route('/api/search/students')
+@coalesce_requests
 @cache_control(120)  # Cache for 2 minutes
 def search_students():
     """
@@ -351,20 +1743,14 @@ def search_students():
     """
     query_text = request.args.get('q', '').strip()
     school_id = request.args.get('schoolId')
-    limit = min(int(request.args.get('limit', 50)), 200)
-    offset = int(request.args.get('offset', 0))
+    limit = parse_limit(50)
+    offset = max(0, int(request.args.get('offset', 0)))
 
     if not query_text:
         return {'error': 'Search query required'}, 400
 
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Build query
-    query = '''
-        SELECT s.student_id as studentId, s.first_name as firstName, s.last_name as lastName,
-               s.grade, s.gender, s.ethnicity, s.address, s.zip_code as zipCode,
-               sc.name as school, sc.id as schoolId
+    # FROM/WHERE shared by the page and count queries
+    from_clause = '''
         FROM students s
         JOIN schools sc ON s.school_id = sc.id
         WHERE (s.first_name LIKE ? OR s.last_name LIKE ? OR s.student_id LIKE ?)
@@ -372,35 +1758,817 @@ def search_students():
     params = [f'%{query_text}%', f'%{query_text}%', f'%{query_text}%']
 
     if school_id:
-        query += ' AND s.school_id = ?'
+        from_clause += ' AND s.school_id = ?'
         params.append(int(school_id))
 
-    # Get total count
-    count_query = query.replace(
-        'SELECT s.student_id as studentId, s.first_name as firstName, s.last_name as lastName, s.grade, s.gender, s.ethnicity, s.address, s.zip_code as zipCode, sc.name as school, sc.id as schoolId',
-        'SELECT COUNT(*)'
+    conn = get_db()
+    cursor = conn.execute(f'''
+        SELECT s.student_id as studentId, s.first_name as firstName, s.last_name as lastName,
+               s.grade, s.gender, s.ethnicity, s.address, s.zip_code as zipCode,
+               sc.name as school, sc.id as schoolId
+        {from_clause}
+        ORDER BY s.last_name, s.first_name LIMIT ? OFFSET ?
+    ''', params + [limit + 1, offset])
+
+    def total(count, has_more):
+        # A short page already tells us where the results end
+        if not has_more and (count or not offset):
+            return {'total': offset + count}
+        return {'total': conn.execute(f'SELECT COUNT(*) {from_clause}', params).fetchone()[0]}
+
+    return stream_list(
+        'students', cursor_batches(cursor), limit,
+        tail=total,
+        on_batch=lambda rows: audit_log.record([row['studentId'] for row in rows], 'view',
+                                               'student_profile', EXPORT_COLUMNS),
+        on_close=conn.close,
     )
-    cursor.execute(count_query, params)
-    total = cursor.fetchone()[0]
 
-    # Add pagination
-    query += ' ORDER BY s.last_name, s.first_name LIMIT ? OFFSET ?'
-    params.extend([limit + 1, offset])
+DEMOGRAPHIC_DIMENSIONS = {
+    'school': ['school_id', 'school'],
+    'grade': ['grade'],
+    'gender': ['gender'],
+    'ethnicity': ['ethnicity'],
+}
+
+DEMOGRAPHIC_FIELDS = {'school_id': 'schoolId', 'school': 'school', 'grade': 'grade',
+                      'gender': 'gender', 'ethnicity': 'ethnicity'}
+
+# Filter query param -> (groupBy dimension, type)
+DEMOGRAPHIC_FILTERS = {'schoolId': ('school', int), 'grade': ('grade', int),
+                       'gender': ('gender', str), 'ethnicity': ('ethnicity', str)}
+
+def parse_demographic_filters():
+    """Read DEMOGRAPHIC_FILTERS params as {dimension: value}. Returns (filters, error)."""
+    filters = {}
+    for param, (dimension, cast) in DEMOGRAPHIC_FILTERS.items():
+        if request.args.get(param):
+            try:
+                filters[dimension] = cast(request.args[param])
+            except ValueError:
+                return None, f'Invalid {param}'
+    return filters, None
+
+@app.route('/api/analytics/demographics')
+@coalesce_requests
+@cache_control(600)  # Cache for 10 minutes
+def get_demographics():
+    """
+    Aggregate student counts by demographic dimensions.
+
+    Answered from the columnar snapshot written by migrate_data.py, using
+    vectorized Arrow group-by instead of SQL against the live database.
+
+    Query params:
+        - groupBy: comma-separated subset of school, grade, gender, ethnicity
+                   (default: grade,gender,ethnicity)
+        - schoolId: int (optional) - Restrict to one school
+        - grade: int (optional) - Restrict to one grade
+        - gender: string (optional) - Restrict to one gender
+        - ethnicity: string (optional) - Restrict to one ethnicity
+
+    Returns:
+        {
+            groups: [{schoolId?, school?, grade?, gender?, ethnicity?, count}],
+            total: int,
+            dataVersion: int
+        }
+    """
+    if pa is None:
+        return {'error': 'Analytics unavailable: pyarrow is not installed'}, 503
+
+    group_by = [d.strip() for d in request.args.get('groupBy', 'grade,gender,ethnicity').split(',') if d.strip()]
+    unknown = [d for d in group_by if d not in DEMOGRAPHIC_DIMENSIONS]
+    if unknown:
+        return {'error': f'Unknown groupBy dimension: {unknown[0]}'}, 400
+
+    filter_values, error = parse_demographic_filters()
+    if error:
+        return {'error': error}, 400
+
+    table = get_demographics_snapshot()
+    if table is None:
+        return {'error': 'Analytics snapshot not found. Run: python3 scripts/migrate_data.py --snapshot'}, 503
+
+    filters = []
+    for dimension, value in filter_values.items():
+        column = table[DEMOGRAPHIC_DIMENSIONS[dimension][0]]
+        if isinstance(value, str):
+            column = column.cast(pa.string())
+        filters.append(pc.equal(column, value))
+
+    if filters:
+        mask = filters[0]
+        for condition in filters[1:]:
+            mask = pc.and_(mask, condition)
+        table = table.filter(mask)
+
+    keys = [column for d in group_by for column in DEMOGRAPHIC_DIMENSIONS[d]]
+    if keys:
+        grouped = table.group_by(keys).aggregate([([], 'count_all')])
+        groups = [
+            {**{DEMOGRAPHIC_FIELDS[k]: row[k] for k in keys}, 'count': row['count_all']}
+            for row in grouped.to_pylist()
+        ]
+        groups.sort(key=lambda g: tuple(g[DEMOGRAPHIC_FIELDS[k]] for k in keys))
+    else:
+        groups = [{'count': table.num_rows}]
+
+    metadata = table.schema.metadata or {}
+
+    return {
+        'groups': groups,
+        'total': table.num_rows,
+        'dataVersion': int(metadata.get(b'data_version', 0))
+    }
+
+# groupBy dimension -> (demographic_cube column, bit in its dimensions mask).
+# Must match CUBE_DIMENSIONS in scripts/migrate_data.py
+DEMOGRAPHIC_CUBE_COLUMNS = {
+    'school': ('school_id', 1),
+    'grade': ('grade', 2),
+    'gender': ('gender', 4),
+    'ethnicity': ('ethnicity', 8),
+}
+
+@app.route('/api/analytics/demographics/summary')
+@coalesce_requests
+@cache_control(600)  # Cache for 10 minutes
+def get_demographic_summary():
+    """
+    Aggregate student counts by demographic dimensions from the summary cube.
+
+    Takes the same query params and returns the same shape as
+    /api/analytics/demographics, but reads one precomputed slice of
+    demographic_cube (built by migrate_data.py) instead of the students, so
+    the cost depends on the groups returned rather than the roster size.
+    Doesn't need pyarrow.
+
+    Returns:
+        {
+            groups: [{schoolId?, school?, grade?, gender?, ethnicity?, count}],
+            total: int,
+            dataVersion: int
+        }
+    """
+    group_by = [d.strip() for d in request.args.get('groupBy', 'grade,gender,ethnicity').split(',') if d.strip()]
+    unknown = [d for d in group_by if d not in DEMOGRAPHIC_CUBE_COLUMNS]
+    if unknown:
+        return {'error': f'Unknown groupBy dimension: {unknown[0]}'}, 400
+    group_by = list(dict.fromkeys(group_by))
+
+    filters, error = parse_demographic_filters()
+    if error:
+        return {'error': error}, 400
+
+    # Filtered dimensions stay broken down so they can be matched; the rest roll
+    # up. Each row of that slice is then exactly one group.
+    dimensions = sum(DEMOGRAPHIC_CUBE_COLUMNS[d][1] for d in set(group_by) | set(filters))
+    conditions = ['c.dimensions = ?'] + [f'c.{DEMOGRAPHIC_CUBE_COLUMNS[d][0]} = ?' for d in filters]
+
+    columns = []
+    for d in group_by:
+        column = DEMOGRAPHIC_CUBE_COLUMNS[d][0]
+        columns.append(f'c.{column} as {DEMOGRAPHIC_FIELDS[column]}')
+        if d == 'school':
+            columns.append('sc.name as school')
+    join = 'LEFT JOIN schools sc ON sc.id = c.school_id' if 'school' in group_by else ''
+    order_by = ', '.join(f'c.{DEMOGRAPHIC_CUBE_COLUMNS[d][0]}' for d in group_by) or '1'
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+    conn = get_db()
+    try:
+        rows = conn.execute(f'''
+            SELECT {''.join(column + ', ' for column in columns)}c.students as count
+            FROM demographic_cube c {join}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order_by}
+        ''', [dimensions] + list(filters.values())).fetchall()
+
+        # Only the grand-total row is guaranteed to exist once the cube is built
+        built = rows or conn.execute(
+            'SELECT 1 FROM demographic_cube WHERE dimensions = 0'
+        ).fetchone() or not conn.execute('SELECT 1 FROM students LIMIT 1').fetchone()
+        version, _ = read_data_version(conn)
+    except sqlite3.OperationalError:
+        built = False  # Database predates the demographic_cube table
+    finally:
+        conn.close()
+
+    if not built:
+        return {'error': 'Demographic cube not built. Run: python3 scripts/migrate_data.py --init --rebuild-stats'}, 503
+
+    groups = [dict(row) for row in rows] if group_by else [{'count': rows[0]['count'] if rows else 0}]
+
+    return {
+        'groups': groups,
+        'total': sum(group['count'] for group in groups),
+        'dataVersion': version
+    }
+
+# Encounter JSON field -> encounters column
+ENCOUNTER_COLUMNS = {
+    'id': 'id',
+    'studentId': 'student_id',
+    'schoolId': 'school_id',
+    'createdAt': 'created_at',
+    'updatedAt': 'updated_at',
+    'chiefComplaint': 'chief_complaint',
+    'subjective': 'subjective',
+    'objective': 'objective',
+    'assessment': 'assessment',
+    'actionsTaken': 'actions_taken',
+    'disposition': 'disposition',
+    'quickTags': 'quick_tags',
+    'followUpNeeded': 'follow_up_needed',
+    'followUpDate': 'follow_up_date',
+    'followUpNotes': 'follow_up_notes',
+    'triggeredHspPrompt': 'triggered_hsp_prompt',
+    'hspPromptAction': 'hsp_prompt_action',
+    'hspDismissReason': 'hsp_dismiss_reason',
+    'duration': 'duration',
+}
+ENCOUNTER_LIST_FIELDS = ('actionsTaken', 'quickTags')
+ENCOUNTER_BOOL_FIELDS = ('followUpNeeded', 'triggeredHspPrompt')
+ENCOUNTER_REQUIRED_FIELDS = ('studentId', 'assessment', 'disposition')
+ENCOUNTER_SERVER_FIELDS = ('id', 'createdAt', 'updatedAt')  # Set by the server on PATCH
+
+ENCOUNTER_INSERT_SQL = f'''
+    INSERT INTO encounters ({', '.join(ENCOUNTER_COLUMNS.values())})
+    VALUES ({', '.join('?' * len(ENCOUNTER_COLUMNS))})
+'''
+ENCOUNTER_UPDATE_SQL = f'''
+    UPDATE encounters
+    SET {', '.join(f'{column} = ?' for column in list(ENCOUNTER_COLUMNS.values())[1:])}
+    WHERE id = ?
+'''
+
+def encounter_to_params(encounter):
+    """Convert an encounter JSON object to INSERT parameters, in column order."""
+    params = []
+    for field in ENCOUNTER_COLUMNS:
+        value = encounter.get(field)
+        if field in ENCOUNTER_LIST_FIELDS:
+            value = json.dumps(value or [])
+        elif field in ENCOUNTER_BOOL_FIELDS:
+            value = int(bool(value))
+        params.append(value)
+    return params
+
+def row_to_encounter(row):
+    """Convert an encounters row to the JSON shape used by the Next.js app."""
+    encounter = {}
+    for field, column in ENCOUNTER_COLUMNS.items():
+        value = row[column]
+        if field in ENCOUNTER_LIST_FIELDS:
+            value = json.loads(value)
+        elif field in ENCOUNTER_BOOL_FIELDS:
+            value = bool(value)
+        elif value is None:
+            continue  # Optional fields are omitted, as in the JSON store
+        encounter[field] = value
+    return encounter
+
+def validate_encounter_fields(encounter):
+    """
+    Check field types before they reach SQLite. Returns an error message or None.
+
+    Only the fields present are checked, so a PATCH body can be validated on
+    its own; required fields present must not be null or empty. createdAt is
+    normalized in place to toISOString() form, so its first ten characters
+    are always the UTC day and string order is time order.
+    """
+    for field in ENCOUNTER_REQUIRED_FIELDS:
+        if field in encounter and not encounter[field]:
+            return f'{field} is required'
+
+    for field, value in encounter.items():
+        if field not in ENCOUNTER_COLUMNS or field in ('duration', 'createdAt') or value is None:
+            continue
+        if field in ENCOUNTER_LIST_FIELDS:
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                return f'{field} must be a list of strings'
+        elif field in ENCOUNTER_BOOL_FIELDS:
+            if not isinstance(value, bool):
+                return f'{field} must be a boolean'
+        elif not isinstance(value, str):
+            return f'{field} must be a string'
+
+    duration = encounter.get('duration')
+    if duration is not None and (isinstance(duration, bool) or not isinstance(duration, (int, float))):
+        return 'duration must be a number'
+
+    created_at = encounter.get('createdAt')
+    if created_at:  # Missing or empty means now
+        try:
+            moment = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            moment = None
+        if moment is None or moment.utcoffset() != timedelta(0):
+            return 'createdAt must be an ISO 8601 UTC timestamp'
+        encounter['createdAt'] = moment.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+    return None
+
+def apply_encounter_rollups(conn, encounter, sign):
+    """
+    Add (sign=1) or remove (sign=-1) one encounter from the statistics rollups.
+
+    Runs inside the caller's write transaction so rollups never drift from
+    the encounters table. Must match rebuild_encounter_stats() in
+    scripts/migrate_data.py.
+    """
+    key = [encounter.get('schoolId') or '', encounter['createdAt'][:10]]
+    duration = encounter.get('duration') or 0
+    has_duration = 1 if duration > 0 else 0
+    action = encounter.get('hspPromptAction')
+
+    conn.execute('''
+        INSERT INTO encounter_daily_stats
+        (school_id, day, encounters, duration_total, duration_count,
+         hsp_triggered, hsp_reviewed, hsp_dismissed)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(school_id, day) DO UPDATE SET
+            encounters = encounters + excluded.encounters,
+            duration_total = duration_total + excluded.duration_total,
+            duration_count = duration_count + excluded.duration_count,
+            hsp_triggered = hsp_triggered + excluded.hsp_triggered,
+            hsp_reviewed = hsp_reviewed + excluded.hsp_reviewed,
+            hsp_dismissed = hsp_dismissed + excluded.hsp_dismissed
+    ''', key + [
+        sign,
+        sign * duration * has_duration,
+        sign * has_duration,
+        sign * int(bool(encounter.get('triggeredHspPrompt'))),
+        sign * int(action == 'reviewed'),
+        sign * int(action == 'dismissed'),
+    ])
+
+    for dimension, value in (('chief_complaint', encounter.get('chiefComplaint')),
+                             ('disposition', encounter.get('disposition'))):
+        conn.execute('''
+            INSERT INTO encounter_daily_counts (school_id, day, dimension, value, count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(school_id, day, dimension, value) DO UPDATE SET
+                count = count + excluded.count
+        ''', key + [dimension, value or '', sign])
+
+    conn.execute('''
+        INSERT INTO encounter_daily_students (school_id, day, student_id, visits)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(school_id, day, student_id) DO UPDATE SET
+            visits = visits + excluded.visits
+    ''', key + [encounter['studentId'], sign])
+
+    if sign < 0:
+        # Drop emptied rows so distinct counts and breakdowns stay exact
+        conn.execute('DELETE FROM encounter_daily_counts WHERE school_id = ? AND day = ? AND count <= 0', key)
+        conn.execute('DELETE FROM encounter_daily_students WHERE school_id = ? AND day = ? AND visits <= 0', key)
+
+@app.route('/api/encounters')
+@coalesce_requests
+def list_encounters():
+    """
+    List encounters, most recent first, with keyset pagination.
+
+    Query params:
+        - studentId: string (optional) - Filter by student
+        - schoolId: string (optional) - Filter by school
+        - date: string (optional) - Filter by day (YYYY-MM-DD, UTC)
+        - limit: int (default: 50) - Number of results
+        - cursor: string (optional) - nextCursor from the previous page
+
+    Returns:
+        {
+            encounters: [{...}],
+            hasMore: bool,
+            nextCursor: string | null
+        }
+    """
+    limit = parse_limit(50)
+    student_id = request.args.get('studentId')
+    school_id = request.args.get('schoolId')
+    day = request.args.get('date')
+    cursor_param = request.args.get('cursor')
+
+    where_conditions = []
+    params = []
+
+    if student_id:
+        where_conditions.append('student_id = ?')
+        params.append(student_id)
+
+    if school_id:
+        where_conditions.append('school_id = ?')
+        params.append(school_id)
+
+    if day:
+        try:
+            next_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+        except ValueError:
+            return {'error': 'date must be YYYY-MM-DD'}, 400
+        where_conditions.append('created_at >= ? AND created_at < ?')
+        params.extend([day, next_day])
+
+    if cursor_param:
+        created_at, _, seq = cursor_param.rpartition('|')
+        if not created_at or not seq.isdigit():
+            return {'error': 'Invalid cursor'}, 400
+        where_conditions.append('(created_at, seq) < (?, ?)')
+        params.extend([created_at, int(seq)])
+
+    where_clause = 'WHERE ' + ' AND '.join(where_conditions) if where_conditions else ''
+
+    conn = get_db()
+    rows = conn.execute(f'''
+        SELECT * FROM encounters
+        {where_clause}
+        ORDER BY created_at DESC, seq DESC
+        LIMIT ?
+    ''', params + [limit + 1]).fetchall()
+    conn.close()
 
     has_more = len(rows) > limit
-    students = [dict(row) for row in rows[:limit]]
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        # An empty page (limit=0) resumes where it started
+        next_cursor = f"{rows[-1]['created_at']}|{rows[-1]['seq']}" if rows else cursor_param
+
+    return {
+        'encounters': [row_to_encounter(row) for row in rows],
+        'hasMore': has_more,
+        'nextCursor': next_cursor
+    }
+
+@app.route('/api/encounters', methods=['POST'])
+def create_encounter():
+    """
+    Record a new encounter.
+
+    Body:
+        Encounter JSON (studentId, assessment and disposition required)
+
+    Returns:
+        { encounter: {...} } with status 201
+    """
+    encounter = request.get_json(silent=True)
+    if not isinstance(encounter, dict):
+        return {'error': 'Request body must be a JSON object'}, 400
+
+    if not encounter.get('studentId') or not encounter.get('assessment') or not encounter.get('disposition'):
+        return {'error': 'Missing required fields: studentId, assessment, disposition'}, 400
+
+    error = validate_encounter_fields(encounter)
+    if error:
+        return {'error': error}, 400
+
+    if not encounter.get('id'):
+        encounter['id'] = f"enc_{int(time.time() * 1000)}_{secrets.token_hex(3)}"
+
+    now = utc_now_iso()
+    encounter['createdAt'] = encounter.get('createdAt') or now
+    encounter['updatedAt'] = now
+
+    conn = get_db()
+    try:
+        with conn:  # Append and rollup update in one transaction
+            conn.execute(ENCOUNTER_INSERT_SQL, encounter_to_params(encounter))
+            apply_encounter_rollups(conn, encounter, 1)
+            # Echo what was stored, not the request body (unknown keys are dropped)
+            row = conn.execute('SELECT * FROM encounters WHERE id = ?', [encounter['id']]).fetchone()
+    except sqlite3.IntegrityError:
+        return {'error': 'Encounter already exists'}, 409
+    finally:
+        conn.close()
+
+    return {'encounter': row_to_encounter(row)}, 201
+
+@app.route('/api/encounters/<encounter_id>')
+def get_encounter(encounter_id):
+    """
+    Get a single encounter.
+
+    Returns:
+        { encounter: {...} }
+    """
+    conn = get_db()
+    row = conn.execute('SELECT * FROM encounters WHERE id = ?', [encounter_id]).fetchone()
+    conn.close()
+
+    if not row:
+        return {'error': 'Encounter not found'}, 404
+
+    return {'encounter': row_to_encounter(row)}
+
+@app.route('/api/encounters/<encounter_id>', methods=['PATCH'])
+def update_encounter(encounter_id):
+    """
+    Update fields of an existing encounter.
+
+    Body:
+        Partial encounter JSON (id and createdAt are ignored)
+
+    Returns:
+        { encounter: {...} }
+    """
+    updates = request.get_json(silent=True)
+    if not isinstance(updates, dict):
+        return {'error': 'Request body must be a JSON object'}, 400
+
+    error = validate_encounter_fields({k: v for k, v in updates.items() if k not in ENCOUNTER_SERVER_FIELDS})
+    if error:
+        return {'error': error}, 400
+
+    conn = get_db()
+    try:
+        conn.execute('BEGIN IMMEDIATE')  # Read-modify-write without a lost update
+        row = conn.execute('SELECT * FROM encounters WHERE id = ?', [encounter_id]).fetchone()
+        if not row:
+            conn.rollback()
+            return {'error': 'Encounter not found'}, 404
+
+        previous = row_to_encounter(row)
+        encounter = dict(previous)
+        encounter.update({k: v for k, v in updates.items()
+                          if k in ENCOUNTER_COLUMNS and k not in ENCOUNTER_SERVER_FIELDS})
+        encounter['updatedAt'] = utc_now_iso()
+
+        conn.execute(ENCOUNTER_UPDATE_SQL, encounter_to_params(encounter)[1:] + [encounter_id])
+        apply_encounter_rollups(conn, previous, -1)
+        apply_encounter_rollups(conn, encounter, 1)
+        row = conn.execute('SELECT * FROM encounters WHERE id = ?', [encounter_id]).fetchone()
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {'encounter': row_to_encounter(row)}
+
+@app.route('/api/encounters/<encounter_id>', methods=['DELETE'])
+def delete_encounter(encounter_id):
+    """
+    Delete an encounter.
+
+    Returns:
+        { success: true }
+    """
+    conn = get_db()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        row = conn.execute('SELECT * FROM encounters WHERE id = ?', [encounter_id]).fetchone()
+        if not row:
+            conn.rollback()
+            return {'error': 'Encounter not found'}, 404
+
+        conn.execute('DELETE FROM encounters WHERE id = ?', [encounter_id])
+        conn.execute('DELETE FROM encounter_hsp_triggers WHERE encounter_id = ?', [encounter_id])
+        apply_encounter_rollups(conn, row_to_encounter(row), -1)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {'success': True}
+
+@app.route('/api/encounters/stats')
+@coalesce_requests
+def get_encounter_stats():
+    """
+    Get encounter statistics from the per-school, per-day rollups.
+
+    Totals and breakdowns cost O(days in range); the unique-student count
+    reads one row per student per day.
+
+    Query params:
+        - from: string (optional) - First day, YYYY-MM-DD
+        - to: string (optional) - Last day, YYYY-MM-DD
+        - schoolId: string (optional) - Restrict to one school
+
+    Returns:
+        {
+            stats: {
+                totalEncounters, uniqueStudents, avgDuration,
+                chiefComplaints: {complaint: count},
+                dispositions: {disposition: count},
+                hsp: {triggered, reviewed, dismissed},
+                byDay: {YYYY-MM-DD: count}  (last 7 days)
+            }
+        }
+    """
+    date_from = request.args.get('from') or '0000-00-00'
+    date_to = request.args.get('to') or '9999-99-99'
+    school_id = request.args.get('schoolId')
+
+    where_clause = 'WHERE day BETWEEN ? AND ?'
+    params = [date_from, date_to]
+    if school_id:
+        where_clause += ' AND school_id = ?'
+        params.append(school_id)
+
+    conn = get_db()
+    cursor = conn.cursor()
+
+    cursor.execute(f'''
+        SELECT COALESCE(SUM(encounters), 0), COALESCE(SUM(duration_total), 0),
+               COALESCE(SUM(duration_count), 0), COALESCE(SUM(hsp_triggered), 0),
+               COALESCE(SUM(hsp_reviewed), 0), COALESCE(SUM(hsp_dismissed), 0)
+        FROM encounter_daily_stats
+        {where_clause}
+    ''', params)
+    total, duration_total, duration_count, triggered, reviewed, dismissed = cursor.fetchone()
+
+    cursor.execute(f'SELECT COUNT(DISTINCT student_id) FROM encounter_daily_students {where_clause}', params)
+    unique_students = cursor.fetchone()[0]
+
+    cursor.execute(f'''
+        SELECT dimension, value, SUM(count)
+        FROM encounter_daily_counts
+        {where_clause}
+        GROUP BY dimension, value
+    ''', params)
+    breakdowns = {'chief_complaint': {}, 'disposition': {}}
+    for dimension, value, count in cursor.fetchall():
+        if count:
+            breakdowns[dimension][value] = count
+
+    # Last 7 days (UTC), still limited to the requested range
+    today = datetime.now(timezone.utc).date()
+    by_day = {(today - timedelta(days=i)).isoformat(): 0 for i in range(6, -1, -1)}
+    window = [max(date_from, min(by_day)), min(date_to, max(by_day))] + params[2:]
+    cursor.execute(f'''
+        SELECT day, SUM(encounters)
+        FROM encounter_daily_stats
+        {where_clause}
+        GROUP BY day
+    ''', window)
+    for day, count in cursor.fetchall():
+        by_day[day] = count
 
     conn.close()
 
     return {
-        'students': students,
-        'total': total,
-        'hasMore': has_more
+        'stats': {
+            'totalEncounters': total,
+            'uniqueStudents': unique_students,
+            'avgDuration': int(duration_total / duration_count + 0.5) if duration_count else 0,
+            'chiefComplaints': breakdowns['chief_complaint'],
+            'dispositions': breakdowns['disposition'],
+            'hsp': {
+                'triggered': triggered,
+                'reviewed': reviewed,
+                'dismissed': dismissed,
+            },
+            'byDay': by_day,
+        }
     }
 
+# Integration resource type -> ferpa_audit_logs.resource_type
+AUDIT_RESOURCE_TYPES = {'immunizations': 'health'}
+
+@app.route('/api/students/<student_id>/integrations/<source>/<resource_type>')
+def get_student_integration(student_id, source, resource_type):
+    """
+    Get a student's record from an external system, through the integration cache.
+
+    Returns:
+        { data: {...} }
+    """
+    upstream = UPSTREAMS.get((source, resource_type))
+    if not upstream:
+        return {'error': f'No integration configured for {source}/{resource_type}'}, 404
+
+    try:
+        data = integration_cache.get(source, resource_type, student_id, upstream['fetch'],
+                                     upstream['ttl'], upstream['staleTtl'])
+    except Exception as e:
+        print(f"⚠ Integration {source}/{resource_type} fetch failed: {e}")
+        return {'error': f'{source} unavailable'}, 502
+
+    audit_log.record([student_id], 'view', AUDIT_RESOURCE_TYPES.get(resource_type, resource_type),
+                     list(data) if isinstance(data, dict) else [], classification='sensitive',
+                     data_source=source)
+
+    return {'data': data}
+
+@app.route('/api/integrations/cache/stats')
+def get_integration_cache_stats():
+    """
+    Get integration cache counters for this server process.
+
+    Returns:
+        { stats: {hits, staleHits, misses, coalesced, refreshes, upstreamErrors, swept} }
+    """
+    return {'stats': dict(integration_cache.stats)}
+
+METRIC_RESOLUTION_NAMES = {'minute': 60, 'hour': 3600, 'day': 86400}
+
+def parse_metric_time(value, default):
+    """Parse an ISO 8601 from/to parameter into a naive UTC datetime."""
+    if not value:
+        return default
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+@app.route('/api/integrations/<source>/metrics')
+def get_integration_metrics(source):
+    """
+    Get time-bucketed metrics for one integration.
+
+    Only the bucket rows inside the requested window are read.
+
+    Query params:
+        - metric: string (optional) - Comma-separated metric names (default: all)
+        - from: string (optional) - ISO 8601 start (default: 24 hours ago)
+        - to: string (optional) - ISO 8601 end, exclusive (default: now)
+        - resolution: string (optional) - minute, hour or day (default: chosen from the window)
+
+    Returns:
+        {
+            integration, resolution, from, to,
+            metrics: {name: [{bucket, count, sum, min, max, avg}]}
+        }
+    """
+    metrics = request.args.get('metric', '').split(',') if request.args.get('metric') else list(METRIC_NAMES)
+    unknown = [metric for metric in metrics if metric not in METRIC_NAMES]
+    if unknown:
+        return {'error': f'Unknown metric: {unknown[0]}'}, 400
+
+    try:
+        end = parse_metric_time(request.args.get('to'), utc_now())
+        start = parse_metric_time(request.args.get('from'), end - timedelta(days=1))
+    except ValueError:
+        return {'error': 'from and to must be ISO 8601 timestamps'}, 400
+
+    resolution = request.args.get('resolution')
+    if resolution:
+        if resolution not in METRIC_RESOLUTION_NAMES:
+            return {'error': 'resolution must be minute, hour or day'}, 400
+        window = METRIC_RESOLUTION_NAMES[resolution]
+    else:
+        span = end - start
+        window = 60 if span <= timedelta(hours=6) else 3600 if span <= timedelta(days=7) else 86400
+        resolution = next(name for name, seconds in METRIC_RESOLUTION_NAMES.items() if seconds == window)
+
+    series = {metric: [] for metric in metrics}
+    for row in integration_metrics.query(source, metrics, start, end, window):
+        series[row['metric']].append({
+            'bucket': row['bucket'],
+            'count': row['count'],
+            'sum': row['total'],
+            'min': row['min'],
+            'max': row['max'],
+            'avg': row['total'] / row['count'] if row['count'] else None,
+        })
+
+    return {
+        'integration': source,
+        'resolution': resolution,
+        'from': sqlite_timestamp(start),
+        'to': sqlite_timestamp(end),
+        'metrics': series,
+    }
+
+@app.route('/api/coalescing/stats')
+def get_coalescing_stats():
+    """
+    Get request coalescing counters for this server process.
+
+    Returns:
+        { routes: {endpoint: {enabled, computed, coalesced}} }
+    """
+    with _coalesce_lock:
+        counts = {endpoint: dict(values) for endpoint, values in coalesce_stats.items()}
+
+    return {
+        'routes': {
+            endpoint: {'enabled': enabled, **counts.get(endpoint, {'computed': 0, 'coalesced': 0})}
+            for endpoint, enabled in COALESCE_ROUTES.items()
+        }
+    }
+
+@app.route('/api/queries/stats')
+def get_query_stats():
+    """
+    Get statement cache counters for this server process.
+
+    Returns:
+        { stats: {executions, compiles, hits, hitRate, distinctStatements,
+                  connectionsOpened, idleConnections, statementCacheSize} }
+    """
+    return {'stats': statement_stats.snapshot()}
+
+@app.route('/api/audit/stats')
+def get_audit_stats():
+    """
+    Get FERPA audit writer counters for this server process.
+
+    Returns:
+        { stats: {enqueued, written, batches, spilled, dropped, waits, writeErrors,
+                  rejectedRows, pending, maxPending, lastBatchRows, lastBatchMs,
+                  writeSeconds, rowsPerSecond} }
+    """
+    return {'stats': audit_log.snapshot()}
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint."""
@@ -415,12 +2583,129 @@ def health_check():
 
     conn.close()
 
+    audit = audit_log.snapshot()
+
     return {
-        'status': 'ok',
+        'status': 'ok' if not audit['dropped'] else 'degraded',
         'studentsCount': student_count,
-        'schoolsCount': school_count
+        'schoolsCount': school_count,
+        'warmUp': _warm_up_state or None,
+        'audit': {key: audit.get(key) for key in ('pending', 'writeErrors', 'spilled', 'dropped')}
     }
 
+# ============================================================================
+# WARM-UP
+# ============================================================================
+
+# Tables (with their indexes) whose pages are read into the OS page cache
+# before serving; covers both the plain and compact student layouts.
+WARM_UP_TABLES = ('students', 'student_records', 'genders', 'ethnicities', 'addresses', 'schools',
+                  'demographic_cube')
+
+_warm_up_state = {}
+
+def pre_touch_pages():
+    """
+    Read the pages of WARM_UP_TABLES and their indexes through a memory map.
+
+    Page numbers come from the dbstat virtual table; SQLite builds without
+    it fall back to touching the whole file. Returns the number of pages read.
+    """
+    conn = get_db()
+    try:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        names = [row[0] for row in conn.execute(f'''
+            SELECT name FROM sqlite_master
+            WHERE tbl_name IN ({', '.join('?' * len(WARM_UP_TABLES))}) AND type IN ('table', 'index')
+        ''', WARM_UP_TABLES)]
+        try:
+            pages = [row[0] for row in conn.execute(f'''
+                SELECT pageno FROM dbstat WHERE name IN ({', '.join('?' * len(names))}) ORDER BY pageno
+            ''', names)]
+        except sqlite3.OperationalError:
+            pages = None  # No dbstat in this SQLite build
+    finally:
+        conn.close()
+
+    with open(DB_PATH, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        if pages is None:
+            pages = range(1, len(view) // page_size + 1)
+        # Pages only in the WAL so far (not yet checkpointed) lie past the end of the file
+        offsets = [(pageno - 1) * page_size for pageno in pages]
+        offsets = [offset for offset in offsets if offset < len(view)]
+        checksum = 0
+        for offset in offsets:
+            checksum ^= view[offset]
+
+    return len(offsets)
+
+def warm_routes():
+    """Run each read route once so its code paths and pages are warm. Returns the request count."""
+    conn = get_db()
+    school = conn.execute('SELECT id FROM schools ORDER BY id LIMIT 1').fetchone()
+    student = conn.execute('SELECT student_id FROM students LIMIT 1').fetchone()
+    conn.close()
+
+    urls = ['/api/schools', '/api/schools?search=a', '/api/search/students?q=a',
+            '/api/analytics/demographics/summary', '/api/encounters?limit=1',
+            '/api/encounters/stats', '/api/health']
+    if school:
+        urls += [f'/api/schools/{school[0]}/students', f'/api/schools/{school[0]}/students?grade=9',
+                 f'/api/schools/{school[0]}/filters']
+    if student:
+        urls.append(f'/api/students/{student[0]}')
+    if pa is not None and Path(SNAPSHOT_PATH).exists():
+        urls.append('/api/analytics/demographics?groupBy=grade')
+
+    # Warm-up requests are not student record views, so keep them out of the audit trail
+    audit_log.enabled = False
+    try:
+        client = app.test_client()
+        for url in urls:
+            client.get(url).get_data()
+    finally:
+        audit_log.enabled = True
+
+    return len(urls)
+
+def warm_up():
+    """
+    Bring the page cache and in-memory indexes up before serving.
+
+    Each step is timed; the timings are printed and reported by /api/health.
+    A failing step is logged and skipped: warm-up only saves the first
+    requests some latency, so it must never keep the server from starting.
+    """
+    steps = [
+        ('pages', pre_touch_pages),
+        ('schoolIndex', lambda: len(get_school_index().schools)),
+        ('filterFacets', lambda: len(get_filter_facets().by_school)),
+        ('routes', warm_routes),
+    ]
+
+    start = time.perf_counter()
+    timings = {}
+    counts = {}
+    errors = {}
+    for name, step in steps:
+        step_start = time.perf_counter()
+        try:
+            counts[name] = step()
+        except Exception as e:
+            counts[name] = 0
+            errors[name] = str(e)
+            print(f"⚠ Warm-up step {name} failed: {e}")
+        timings[name] = round((time.perf_counter() - step_start) * 1000, 1)
+
+    _warm_up_state.update(
+        totalMs=round((time.perf_counter() - start) * 1000, 1),
+        stepsMs=timings,
+        counts=counts,
+        errors=errors,
+        finishedAt=utc_now_iso(),
+    )
+    return _warm_up_state
+
 # ============================================================================
 # STATIC FILE SERVING (for testing)
 # ============================================================================
@@ -446,6 +2731,15 @@ if __name__ == '__main__':
         print("Please run: python3 scripts/migrate_data.py --init --import data/generated_students.json")
         exit(1)
 
+    # Warm caches before accepting requests. The debug reloader runs this block
+    # in its file watcher too; only the serving child (WERKZEUG_RUN_MAIN) warms up
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        state = warm_up()
+        print(f"{'⚠' if state['errors'] else '✓'} Warm-up finished in {state['totalMs']:.0f}ms: "
+              f"{state['counts']['pages']:,} pages read, "
+              f"{state['counts']['schoolIndex']} schools indexed (data version {get_data_version()[0]}), "
+              f"{state['counts']['routes']} routes exercised")
+
     print(f"")
     print(f"🚀 Aspen-Lite API Server v2")
     print(f"📊 Database: {DB_PATH}")
@@ -455,10 +2749,26 @@ if __name__ == '__main__':
     print(f"Available endpoints:")
     print(f"  GET  /api/schools")
     print(f"  POST /api/schools/favorites")
+    print(f"  POST /api/schools/overview")
     print(f"  GET  /api/schools/:id/students")
+    print(f"  GET  /api/schools/:id/students/export")
     print(f"  GET  /api/students/:id")
     print(f"  GET  /api/schools/:id/filters")
     print(f"  GET  /api/search/students")
+    print(f"  GET  /api/analytics/demographics")
+    print(f"  GET  /api/analytics/demographics/summary")
+    print(f"  GET  /api/encounters")
+    print(f"  POST /api/encounters")
+    print(f"  GET  /api/encounters/:id")
+    print(f"  GET  /api/encounters/stats")
+    print(f"  GET  /api/students/:id/integrations/:source/:type")
+    print(f"  GET  /api/integrations/cache/stats")
+    print(f"  GET  /api/integrations/:source/metrics")
+    print(f"  GET  /api/coalescing/stats")
+    print(f"  GET  /api/queries/stats")
+    print(f"  GET  /api/audit/stats")
+    print(f"  PATCH /api/encounters/:id")
+    print(f"  DELETE /api/encounters/:id")
     print(f"  GET  /api/health")
     print(f"")
     print(f"Press Ctrl+C to stop")